@@ -0,0 +1,55 @@
+"""
+Per-test output buffering for the script-style test runners
+
+Tests gathered concurrently would interleave their prints, so each test
+writes into its own buffer and the runner prints the buffers in order.
+"""
+
+import io
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Output buffer of the test running in the current task
+_test_output: ContextVar[Optional[io.StringIO]] = ContextVar("_test_output", default=None)
+
+
+class TaskLocalStdout:
+    """stdout proxy that writes to the current test's buffer when one is set"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return (_test_output.get() or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+    
+    def __getattr__(self, name):
+        # isatty, encoding, fileno and the rest come from the real stream
+        return getattr(self._stream, name)
+
+
+@contextmanager
+def task_local_stdout():
+    """Route sys.stdout through TaskLocalStdout for the duration of the block"""
+    stdout = sys.stdout
+    sys.stdout = TaskLocalStdout(stdout)
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+
+async def run_buffered(test_name, test_func):
+    """Run one test with its output captured, returning (result, output)"""
+    buffer = io.StringIO()
+    _test_output.set(buffer)
+    try:
+        result = await test_func()
+    except Exception as e:
+        print(f"❌ {test_name} failed with exception: {str(e)}")
+        result = False
+    return result, buffer.getvalue()
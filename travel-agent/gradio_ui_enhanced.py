@@ -372,7 +372,7 @@ def create_chat_interface():
         return demo
 
 
-def launch_enhanced_ui(share: bool = False, server_port: int = 7860):
+def launch_enhanced_ui(share: bool = False, server_port: int = 7860, concurrency_count: int = 8):
     """
     Launch the enhanced natural language chat UI
     """
@@ -385,6 +385,7 @@ def launch_enhanced_ui(share: bool = False, server_port: int = 7860):
     print(f"💬 Ready for natural language travel conversations!")
     
     demo = create_chat_interface()
+    demo.queue(default_concurrency_limit=concurrency_count, max_size=64, api_open=False)
     demo.launch(
         share=share,
         server_port=server_port,
@@ -16,6 +16,7 @@ from typing import Optional
 
 from src.models.travel_models import TravelRequest
 from src.agents.travel_agent import LangGraphTravelAgent
+from src.workflow.http_client import close_http_client
 
 
 async def create_agent_with_fallback(prefer_postgres: bool = True) -> LangGraphTravelAgent:
@@ -143,10 +144,33 @@ async def benchmark_performance():
     print(f"Success Rate: {success_rate:.1f}%")
 
 
+async def run_and_close(coro):
+    """
+    Await a CLI coroutine, then release pooled HTTP connections before the loop exits
+    """
+    try:
+        return await coro
+    finally:
+        await close_http_client()
+
+
+def install_uvloop():
+    """
+    Run the asyncio event loop on uvloop when it is installed (not available on Windows)
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
+
+
 def main():
     """
     Main entry point with argument parsing
     """
+    install_uvloop()
+    
     parser = argparse.ArgumentParser(description="LangGraph Travel Agent")
     parser.add_argument(
         "mode",
@@ -175,10 +199,10 @@ def main():
         end_date = args.end_date or "2025-06-07"
         travelers = args.travelers
         
-        asyncio.run(run_single_request(destination, start_date, end_date, travelers))
+        asyncio.run(run_and_close(run_single_request(destination, start_date, end_date, travelers)))
     
     elif args.mode == "benchmark":
-        asyncio.run(benchmark_performance())
+        asyncio.run(run_and_close(benchmark_performance()))
 
 
 if __name__ == "__main__":
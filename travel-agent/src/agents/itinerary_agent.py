@@ -6,13 +6,12 @@ without any Temporal dependencies.
 """
 
 import openai
-import os
 import json
 from typing import Dict, Any
 from pydantic import BaseModel
 from langgraph.graph import StateGraph, END
 from src.models.travel_models import TravelRequest, FlightDetails, AccommodationDetails
-from src.workflow.constants import AGENTIC_GOAL, DEFAULT_LLM_MODEL
+from src.workflow.constants import AGENTIC_GOAL, DEFAULT_LLM_MODEL, OPENAI_API_KEY
 
 
 class ItineraryCreationState(BaseModel):
@@ -89,7 +88,7 @@ class LangGraphItineraryAgent:
                 model=DEFAULT_LLM_MODEL,
                 messages=state.messages,
                 functions=[self.function_definition],
-                api_key=os.getenv("OPENAI_API_KEY")
+                api_key=OPENAI_API_KEY
             )
             state.llm_response = response
         except Exception as e:
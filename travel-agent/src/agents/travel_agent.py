@@ -16,7 +16,8 @@ Features:
 import asyncio
 import json
 import os
-from typing import Dict, List, Any, Literal, Optional
+import uuid
+from typing import Dict, List, Any, Literal, Optional, Set
 from pydantic import BaseModel
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
@@ -26,6 +27,10 @@ from src.agents.flight_search_agent import LangGraphFlightSearchAgent
 from src.agents.accommodation_agent import LangGraphAccommodationAgent
 from src.agents.itinerary_agent import LangGraphItineraryAgent
 
+# Task-set constants for routing membership tests, built once instead of per call
+_SEARCH_TASKS = frozenset({"flight_search", "accommodation_search"})
+_ALL_TASKS = frozenset({"flight_search", "accommodation_search", "itinerary_creation"})
+
 
 class TravelPlanningState(BaseModel):
     """Shared state for the entire travel planning system"""
@@ -34,7 +39,7 @@ class TravelPlanningState(BaseModel):
     accommodation_details: Dict[str, Any] = {}  # Changed from AccommodationDetails to dict
     itinerary: Optional[str] = None
     agent_messages: List[Dict[str, Any]] = []
-    completed_tasks: List[str] = []
+    completed_tasks: Set[str] = set()  # Set keeps membership tests O(1); last value wins so a new run starts clean
     errors: Dict[str, str] = {}
     next_action: str = "start"
     user_feedback: Optional[str] = None
@@ -129,10 +134,22 @@ class LangGraphTravelAgent:
             }
         )
         
-        # All coordinators flow back to supervisor
-        workflow.add_edge(["flight_coordinator", "accommodation_coordinator", "itinerary_coordinator"], "supervisor")
+        # Search coordinators flow back to supervisor
+        workflow.add_edge("flight_coordinator", "supervisor")
+        workflow.add_edge("accommodation_coordinator", "supervisor")
+        
+        # After the itinerary every core task is done, so skip the supervisor hop
+        workflow.add_conditional_edges(
+            "itinerary_coordinator",
+            self._route_after_itinerary,
+            {
+                "get_feedback": "human_feedback",
+                "complete": "result_aggregator",
+                "supervisor": "supervisor"
+            }
+        )
+        workflow.add_edge("human_feedback", "result_aggregator")
         workflow.add_edge("result_aggregator", END)
-        workflow.add_edge("human_feedback", "supervisor")
         
         return workflow.compile(
             checkpointer=self.checkpointer,
@@ -141,7 +158,7 @@ class LangGraphTravelAgent:
     
     def _route_from_supervisor(self, state: TravelPlanningState) -> str:
         """Route decisions from the supervisor"""
-        completed = set(state.completed_tasks)
+        completed = state.completed_tasks
         
         # If nothing started, begin with flight search
         if not completed:
@@ -152,12 +169,12 @@ class LangGraphTravelAgent:
             return "accommodation_search"
         
         # If searches done but no itinerary, create one
-        if {"flight_search", "accommodation_search"}.issubset(completed):
+        if _SEARCH_TASKS.issubset(completed):
             if "itinerary_creation" not in completed:
                 return "create_itinerary"
         
         # If all core tasks done, check if we need user feedback
-        if len(completed) >= 3:
+        if _ALL_TASKS.issubset(completed):
             if not state.user_feedback:
                 return "get_feedback"
             else:
@@ -165,6 +182,12 @@ class LangGraphTravelAgent:
         
         return "end"
     
+    def _route_after_itinerary(self, state: TravelPlanningState) -> str:
+        """Go straight to feedback or aggregation once the itinerary exists"""
+        if "itinerary_creation" not in state.completed_tasks:
+            return "supervisor"
+        return "complete" if state.user_feedback else "get_feedback"
+    
     async def _supervisor(self, state: TravelPlanningState) -> TravelPlanningState:
         """
         Supervisor Agent: High-level coordination and decision making
@@ -185,7 +208,7 @@ class LangGraphTravelAgent:
             remaining.append("flight_search")
         if "accommodation_search" not in state.completed_tasks:
             remaining.append("accommodation_search")
-        if len(state.completed_tasks) >= 2 and "itinerary_creation" not in state.completed_tasks:
+        if _SEARCH_TASKS.issubset(state.completed_tasks) and "itinerary_creation" not in state.completed_tasks:
             remaining.append("itinerary_creation")
         
         print(f"🧠 Supervisor: Remaining tasks: {remaining}")
@@ -218,7 +241,7 @@ class LangGraphTravelAgent:
                 "arrival_time": flight_details.arrival_time,
                 "price": flight_details.price
             }
-            state.completed_tasks.append("flight_search")
+            state.completed_tasks.add("flight_search")
             
             state.agent_messages.append({
                 "agent": "flight_coordinator",
@@ -267,7 +290,7 @@ class LangGraphTravelAgent:
                 "price_per_night": accommodation_details.price_per_night,
                 "total_price": accommodation_details.total_price
             }
-            state.completed_tasks.append("accommodation_search")
+            state.completed_tasks.add("accommodation_search")
             
             state.agent_messages.append({
                 "agent": "accommodation_coordinator",
@@ -332,7 +355,7 @@ class LangGraphTravelAgent:
                 flight_details, 
                 accommodation_details
             )
-            state.completed_tasks.append("itinerary_creation")
+            state.completed_tasks.add("itinerary_creation")
             
             state.agent_messages.append({
                 "agent": "itinerary_coordinator",
@@ -398,6 +421,48 @@ class LangGraphTravelAgent:
         
         return state
     
+    def _build_result(self, final_state: TravelPlanningState, thread_id: str) -> Dict[str, Any]:
+        """Convert a final workflow state into the run() result"""
+        # Convert dictionaries back to model objects for the return value
+        flight_details = None
+        if final_state.flight_details:
+            flight_details = FlightDetails(
+                airline=final_state.flight_details.get("airline"),
+                flight_number=final_state.flight_details.get("flight_number"),
+                departure_time=final_state.flight_details.get("departure_time"),
+                arrival_time=final_state.flight_details.get("arrival_time"),
+                price=final_state.flight_details.get("price")
+            )
+        
+        accommodation_details = None
+        if final_state.accommodation_details:
+            accommodation_details = AccommodationDetails(
+                hotel_name=final_state.accommodation_details.get("hotel_name"),
+                check_in_date=final_state.accommodation_details.get("check_in_date"),
+                check_out_date=final_state.accommodation_details.get("check_out_date"),
+                price_per_night=final_state.accommodation_details.get("price_per_night"),
+                total_price=final_state.accommodation_details.get("total_price")
+            )
+        
+        return {
+            "success": True,
+            "thread_id": thread_id,
+            "flight_details": flight_details,
+            "accommodation_details": accommodation_details,
+            "itinerary": final_state.itinerary,
+            "agent_messages": final_state.agent_messages,
+            "completed_tasks": sorted(final_state.completed_tasks),
+            "errors": final_state.errors,
+            "user_feedback": final_state.user_feedback,
+            "execution_summary": {
+                "total_agents_used": 4,
+                "successful_tasks": len(final_state.completed_tasks),
+                "failed_tasks": len(final_state.errors),
+                "parallel_execution": final_state.parallel_tasks_running,
+                "human_interaction": bool(final_state.user_feedback)
+            }
+        }
+    
     async def run(self, request: TravelRequest, thread_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Run the complete travel planning workflow
@@ -410,10 +475,8 @@ class LangGraphTravelAgent:
             Complete travel plan with execution details
         """
         if not thread_id:
-            # Create a safe thread ID from request properties
-            import uuid
-            request_str = f"{request.destination}-{request.start_date}-{request.end_date}-{request.number_of_travelers}"
-            thread_id = f"travel-{hash(request_str) % 10000}"  # Limit to 4 digits
+            # A fresh ID per run, so separate requests never share a checkpoint
+            thread_id = f"travel-{uuid.uuid4().hex}"
         
         print(f"🚀 Starting travel planning for thread: {thread_id}")
         
@@ -432,46 +495,7 @@ class LangGraphTravelAgent:
         
         try:
             final_state = await self.workflow.ainvoke(initial_state, config=config)
-            
-            # Convert dictionaries back to model objects for the return value
-            flight_details = None
-            if final_state.flight_details:
-                flight_details = FlightDetails(
-                    airline=final_state.flight_details.get("airline"),
-                    flight_number=final_state.flight_details.get("flight_number"),
-                    departure_time=final_state.flight_details.get("departure_time"),
-                    arrival_time=final_state.flight_details.get("arrival_time"),
-                    price=final_state.flight_details.get("price")
-                )
-            
-            accommodation_details = None
-            if final_state.accommodation_details:
-                accommodation_details = AccommodationDetails(
-                    hotel_name=final_state.accommodation_details.get("hotel_name"),
-                    check_in_date=final_state.accommodation_details.get("check_in_date"),
-                    check_out_date=final_state.accommodation_details.get("check_out_date"),
-                    price_per_night=final_state.accommodation_details.get("price_per_night"),
-                    total_price=final_state.accommodation_details.get("total_price")
-                )
-            
-            return {
-                "success": True,
-                "thread_id": thread_id,
-                "flight_details": flight_details,
-                "accommodation_details": accommodation_details,
-                "itinerary": final_state.itinerary,
-                "agent_messages": final_state.agent_messages,
-                "completed_tasks": final_state.completed_tasks,
-                "errors": final_state.errors,
-                "user_feedback": final_state.user_feedback,
-                "execution_summary": {
-                    "total_agents_used": 4,
-                    "successful_tasks": len(final_state.completed_tasks),
-                    "failed_tasks": len(final_state.errors),
-                    "parallel_execution": final_state.parallel_tasks_running,
-                    "human_interaction": bool(final_state.user_feedback)
-                }
-            }
+            return self._build_result(final_state, thread_id)
             
         except Exception as e:
             return {
@@ -485,10 +509,8 @@ class LangGraphTravelAgent:
         Stream workflow execution for real-time updates
         """
         if not thread_id:
-            # Create a safe thread ID from request properties
-            import uuid
-            request_str = f"{request.destination}-{request.start_date}-{request.end_date}-{request.number_of_travelers}"
-            thread_id = f"travel-{hash(request_str) % 10000}"  # Limit to 4 digits
+            # A fresh ID per run, so separate requests never share a checkpoint
+            thread_id = f"travel-{uuid.uuid4().hex}"
         
         initial_state = TravelPlanningState(
             request={
@@ -512,6 +534,11 @@ class LangGraphTravelAgent:
         config = {"configurable": {"thread_id": thread_id}}
         return self.workflow.get_state(config)
     
+    def get_result(self, thread_id: str) -> Dict[str, Any]:
+        """Build the run() result from the latest checkpoint of a thread"""
+        final_state = TravelPlanningState.model_validate(self.get_state(thread_id).values)
+        return self._build_result(final_state, thread_id)
+    
     async def get_state_history(self, thread_id: str, limit: int = 10):
         """Get state history for a thread"""
         config = {"configurable": {"thread_id": thread_id}}
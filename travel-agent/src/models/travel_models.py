@@ -1,4 +1,6 @@
 # Data models for Travel AI Agent
+from dataclasses import dataclass
+
 class TravelRequest:
     def __init__(self, destination, start_date, end_date, number_of_travelers):
         self.destination = destination
@@ -21,3 +23,10 @@ class AccommodationDetails:
         self.check_out_date = check_out_date
         self.price_per_night = price_per_night
         self.total_price = total_price
+
+@dataclass
+class ItineraryInput:
+    """Single create_itinerary activity argument, so Temporal encodes one payload instead of three"""
+    request: TravelRequest
+    flight: FlightDetails
+    accommodation: AccommodationDetails
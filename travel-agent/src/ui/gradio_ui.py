@@ -7,12 +7,16 @@ using only LangGraph, with no Temporal dependencies.
 
 import gradio as gr
 import asyncio
-import json
+import orjson
 import re
 import os
-from typing import Tuple
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Tuple
 from src.models.travel_models import TravelRequest
 from src.agents.travel_agent import LangGraphTravelAgent
+from src.workflow.constants import PLAN_CACHE_TTL_SECONDS
 
 
 # Initialize the travel agent with automatic PostgreSQL detection
@@ -38,13 +42,35 @@ async def initialize_agent():
     
     return LangGraphTravelAgent(use_postgres=False), "Memory"
 
-# Initialize agent
-loop = asyncio.new_event_loop()
-asyncio.set_event_loop(loop)
-travel_agent, checkpointer_type = loop.run_until_complete(initialize_agent())
-loop.close()
+# Agent is created lazily on the server's event loop by the first request
+travel_agent = None
+checkpointer_type = None
+_agent_lock = asyncio.Lock()
 
 
+async def get_travel_agent() -> LangGraphTravelAgent:
+    """Return the shared travel agent, initializing it on first use"""
+    global travel_agent, checkpointer_type
+    if travel_agent is None:
+        async with _agent_lock:
+            if travel_agent is None:
+                travel_agent, checkpointer_type = await initialize_agent()
+    return travel_agent
+
+
+# Pattern used by parse_travel_request, compiled once at import. One
+# alternation scanned left to right; the date branch is listed first so its
+# "to" is consumed there; destinations and end dates stop before a trailing
+# "for"/"from" so the traveler count after them is still seen
+_REQUEST_RE = re.compile(
+    r'(?P<dates>\bfrom (?P<start>[A-Za-z0-9 -]+) to (?P<end>[A-Za-z0-9-]+(?: (?!for\b)[A-Za-z0-9-]+)*))'
+    r'|(?P<num>\bfor (?P<travelers>\d+) (?:people|person|travelers?|travellers?))'
+    r'|(?P<dest>\bto (?P<destination>[A-Za-z]+(?: (?!for\b|from\b)[A-Za-z]+)*))',
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=256)
 def parse_travel_request(message: str) -> Tuple[str, str, str, int]:
     """
     Parse natural language travel request into structured data
@@ -61,18 +87,17 @@ def parse_travel_request(message: str) -> Tuple[str, str, str, int]:
     number_of_travelers = 1
     
     # Example: "Book a trip to Paris for 2 people from Jan 5 to Jan 10"
-    dest_match = re.search(r'to ([A-Za-z ]+)', message, re.IGNORECASE)
-    if dest_match:
-        destination = dest_match.group(1).strip()
-    
-    num_match = re.search(r'for (\d+) (?:people|person|travelers?|travellers?)', message, re.IGNORECASE)
-    if num_match:
-        number_of_travelers = int(num_match.group(1))
-    
-    date_match = re.search(r'from ([A-Za-z0-9 -]+) to ([A-Za-z0-9 -]+)', message, re.IGNORECASE)
-    if date_match:
-        start_date = date_match.group(1).strip()
-        end_date = date_match.group(2).strip()
+    num_found = False
+    for match in _REQUEST_RE.finditer(message):
+        kind = match.lastgroup
+        if kind == "dates" and not start_date:
+            start_date = match.group("start").strip()
+            end_date = match.group("end").strip()
+        elif kind == "num" and not num_found:
+            number_of_travelers = int(match.group("travelers"))
+            num_found = True
+        elif kind == "dest" and not destination:
+            destination = match.group("destination").strip()
     
     # Fallbacks
     if not destination:
@@ -85,118 +110,208 @@ def parse_travel_request(message: str) -> Tuple[str, str, str, int]:
     return destination, start_date, end_date, number_of_travelers
 
 
-async def run_travel_planning(destination: str, start_date: str, end_date: str, number_of_travelers: int) -> str:
+# Static response scaffolding, built once and filled with per-request fields
+_PARSING_SUMMARY_TEMPLATE = """
+📝 **Understanding your request:**
+- Destination: {destination}
+- Start Date: {start_date}
+- End Date: {end_date}
+- Number of Travelers: {number_of_travelers}
+
+🔄 **Planning your trip...**
+
+"""
+
+_PLAN_RESULT_TEMPLATE = """
+🎉 **Travel Plan Successfully Created!**
+
+✈️ **Flight Details:**
+- Airline: {airline}
+- Flight Number: {flight_number}
+- Departure: {departure}
+- Return: {arrival}
+- Price: ${flight_price}
+
+🏨 **Accommodation:**
+- Hotel: {hotel_name}
+- Check-in: {check_in}
+- Check-out: {check_out}
+- Price per night: ${price_per_night}
+- Total price: ${total_price}
+
+📋 **Itinerary:**
+{itinerary}
+
+📊 **Execution Summary:**
+- Total agents used: {total_agents_used}
+- Successful tasks: {successful_tasks}
+- Failed tasks: {failed_tasks}
+- Parallel execution: {parallel_execution}
+
+🔍 **Agent Activity:**
+"""
+
+_AGENT_PROGRESS = {
+    "supervisor": "🧠 Supervisor coordinated the next step",
+    "flight_coordinator": "✈️ Flight search finished",
+    "accommodation_coordinator": "🏨 Accommodation search finished",
+    "itinerary_coordinator": "📋 Itinerary created",
+    "human_feedback": "👤 Plan reviewed",
+    "result_aggregator": "📊 Final plan compiled"
+}
+
+_STRUCTURED_RESULT_TEMPLATE = """
+✅ **Travel Plan Complete!**
+
+🎯 **Trip Summary:**
+- **Destination:** {destination}
+- **Dates:** {start_date} to {end_date}
+- **Travelers:** {travelers}
+- **Thread ID:** {thread_id}
+
+✈️ **Flight Details:**
+- **Airline:** {airline}
+- **Flight:** {flight_number}
+- **Departure:** {departure}
+- **Return:** {arrival}
+- **Price:** ${flight_price}
+
+🏨 **Accommodation:**
+- **Hotel:** {hotel_name}
+- **Check-in:** {check_in}
+- **Check-out:** {check_out}
+- **Price:** ${price_per_night}/night
+
+📋 **Itinerary:**
+{itinerary}
+
+📊 **Agent Activity:**
+- **Completed Tasks:** {completed_tasks}
+- **Total Agent Messages:** {message_count}
+"""
+
+
+def format_travel_plan(result: Dict[str, Any]) -> str:
     """
-    Run the travel planning workflow
+    Format a travel agent result for display
     
     Args:
-        destination: Travel destination
-        start_date: Trip start date
-        end_date: Trip end date
-        number_of_travelers: Number of travelers
+        result: Result dictionary returned by the travel agent
         
     Returns:
-        Formatted travel plan result
+        Formatted travel plan or error message
     """
-    try:
-        # Create travel request
-        request = TravelRequest(
-            destination=destination,
-            start_date=start_date,
-            end_date=end_date,
-            number_of_travelers=number_of_travelers
+    if result["success"]:
+        # Format the response nicely
+        flight = result['flight_details']
+        accommodation = result['accommodation_details']
+        summary = result['execution_summary']
+        parts = [_PLAN_RESULT_TEMPLATE.format(
+            airline=flight.airline,
+            flight_number=flight.flight_number,
+            departure=flight.departure_time,
+            arrival=flight.arrival_time,
+            flight_price=flight.price,
+            hotel_name=accommodation.hotel_name,
+            check_in=accommodation.check_in_date,
+            check_out=accommodation.check_out_date,
+            price_per_night=accommodation.price_per_night,
+            total_price=accommodation.total_price,
+            itinerary=result['itinerary'],
+            total_agents_used=summary['total_agents_used'],
+            successful_tasks=summary['successful_tasks'],
+            failed_tasks=summary['failed_tasks'],
+            parallel_execution='Yes' if summary['parallel_execution'] else 'No'
+        )]
+        
+        # Add agent messages
+        parts.extend(
+            f"\n- {msg['agent']}: {msg['action']} - {msg.get('message', 'N/A')}"
+            for msg in result['agent_messages'][-5:]  # Show last 5 messages
         )
         
-        # Run the travel agent
-        result = await travel_agent.run(request)
+        if result['errors']:
+            parts.append("\n\n⚠️ **Errors encountered:**\n")
+            parts.extend(f"- {agent}: {error}\n" for agent, error in result['errors'].items())
         
-        if result["success"]:
-            # Format the response nicely
-            response = f"""
-🎉 **Travel Plan Successfully Created!**
-
-✈️ **Flight Details:**
-- Airline: {result['flight_details'].airline}
-- Flight Number: {result['flight_details'].flight_number}
-- Departure: {result['flight_details'].departure_date}
-- Return: {result['flight_details'].return_date}
-- Price: ${result['flight_details'].price}
+        return "".join(parts)
+        
+    else:
+        return f"❌ **Error:** {result['error']}"
 
-🏨 **Accommodation:**
-- Hotel: {result['accommodation_details'].hotel_name}
-- Check-in: {result['accommodation_details'].check_in_date}
-- Check-out: {result['accommodation_details'].check_out_date}
-- Price per night: ${result['accommodation_details'].price_per_night}
-- Total price: ${result['accommodation_details'].total_price}
 
-📋 **Itinerary:**
-{result['itinerary']}
+# Formatted plans keyed by request fields, stored as (created_at, plan)
+_plan_cache: Dict[Tuple[str, str, str, int], Tuple[float, str]] = {}
+_PLAN_CACHE_MAX_ENTRIES = 256
 
-📊 **Execution Summary:**
-- Total agents used: {result['execution_summary']['total_agents_used']}
-- Successful tasks: {result['execution_summary']['successful_tasks']}
-- Failed tasks: {result['execution_summary']['failed_tasks']}
-- Parallel execution: {'Yes' if result['execution_summary']['parallel_execution'] else 'No'}
 
-🔍 **Agent Activity:**
-"""
-            
-            # Add agent messages
-            for msg in result['agent_messages'][-5:]:  # Show last 5 messages
-                response += f"\n- {msg['agent']}: {msg['action']} - {msg.get('message', 'N/A')}"
-            
-            if result['errors']:
-                response += f"\n\n⚠️ **Errors encountered:**\n"
-                for agent, error in result['errors'].items():
-                    response += f"- {agent}: {error}\n"
-            
-            return response
-            
-        else:
-            return f"❌ **Error:** {result['error']}"
-            
-    except Exception as e:
-        return f"❌ **System Error:** {str(e)}"
+def _store_plan(cache_key: Tuple[str, str, str, int], plan: str) -> None:
+    """Cache a formatted plan, evicting the oldest entry when full"""
+    _plan_cache.pop(cache_key, None)
+    if len(_plan_cache) >= _PLAN_CACHE_MAX_ENTRIES:
+        _plan_cache.pop(next(iter(_plan_cache)))
+    _plan_cache[cache_key] = (time.monotonic(), plan)
 
 
-def natural_language_travel_agent(message: str) -> str:
+async def natural_language_travel_agent(message: str) -> AsyncIterator[str]:
     """
     Main interface function for Gradio
     
+    Yields the parsed request right away, then agent progress as each
+    step finishes, then the complete travel plan.
+    
     Args:
         message: Natural language travel request
         
-    Returns:
-        Formatted travel plan or error message
+    Yields:
+        Formatted travel plan so far, or error message
     """
     try:
         # Parse the message
         destination, start_date, end_date, number_of_travelers = parse_travel_request(message)
         
         # Show what we understood
-        parsing_result = f"""
-📝 **Understanding your request:**
-- Destination: {destination}
-- Start Date: {start_date}
-- End Date: {end_date}
-- Number of Travelers: {number_of_travelers}
-
-🔄 **Planning your trip...**
-
-"""
+        parsing_result = _PARSING_SUMMARY_TEMPLATE.format(
+            destination=destination,
+            start_date=start_date,
+            end_date=end_date,
+            number_of_travelers=number_of_travelers
+        )
+        yield parsing_result
         
-        # Run the travel planning (synchronously for Gradio)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(
-            run_travel_planning(destination, start_date, end_date, number_of_travelers)
+        # A recent identical request already has a finished plan
+        cache_key = (destination, start_date, end_date, number_of_travelers)
+        cached = _plan_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < PLAN_CACHE_TTL_SECONDS:
+            yield parsing_result + cached[1]
+            return
+        
+        request = TravelRequest(
+            destination=destination,
+            start_date=start_date,
+            end_date=end_date,
+            number_of_travelers=number_of_travelers
         )
-        loop.close()
         
-        return parsing_result + result
+        # Stream agent progress while the workflow runs
+        agent = await get_travel_agent()
+        progress = []
+        thread_id = f"ui-{uuid.uuid4().hex}"
+        async for update in agent.stream(request, thread_id=thread_id):
+            # __interrupt__ marks the pause before human feedback, not an agent step
+            progress.extend(f"- {_AGENT_PROGRESS.get(node, node)}\n" for node in update["chunk"] if node != "__interrupt__")
+            yield parsing_result + "".join(progress)
+        
+        # Build the final plan from the thread's last checkpoint
+        result = agent.get_result(thread_id)
+        plan = format_travel_plan(result)
+        # Only successful plans are reused; failures should be retried
+        if result["success"]:
+            _store_plan(cache_key, plan)
+        yield parsing_result + plan
         
     except Exception as e:
-        return f"❌ **Error processing request:** {str(e)}"
+        yield f"❌ **Error processing request:** {str(e)}"
 
 
 async def stream_travel_planning(message: str):
@@ -212,8 +327,9 @@ async def stream_travel_planning(message: str):
         number_of_travelers=number_of_travelers
     )
     
-    async for update in travel_agent.stream(request):
-        yield f"🔄 Update: {json.dumps(update, indent=2, default=str)}\n"
+    agent = await get_travel_agent()
+    async for update in agent.stream(request):
+        yield f"🔄 Update: {orjson.dumps(update, option=orjson.OPT_INDENT_2, default=str).decode()}\n"
 
 
 async def plan_trip_structured(destination: str, start_date: str, end_date: str, travelers: int, thread_id: str = "") -> str:
@@ -241,46 +357,37 @@ async def plan_trip_structured(destination: str, start_date: str, end_date: str,
         )
         
         # Run the travel planning
-        result = await travel_agent.run(request, thread_id=thread_id)
+        agent = await get_travel_agent()
+        result = await agent.run(request, thread_id=thread_id)
         
         if result.get("success", False):
-            response = f"""
-✅ **Travel Plan Complete!**
-
-🎯 **Trip Summary:**
-- **Destination:** {destination}
-- **Dates:** {start_date} to {end_date}
-- **Travelers:** {travelers}
-- **Thread ID:** {thread_id}
-
-✈️ **Flight Details:**
-- **Airline:** {result['flight_details'].airline}
-- **Flight:** {result['flight_details'].flight_number}
-- **Departure:** {result['flight_details'].departure_time}
-- **Return:** {result['flight_details'].return_time}
-- **Price:** ${result['flight_details'].price}
-
-🏨 **Accommodation:**
-- **Hotel:** {result['accommodation_details'].hotel_name}
-- **Address:** {result['accommodation_details'].address}
-- **Check-in:** {result['accommodation_details'].checkin_date}
-- **Check-out:** {result['accommodation_details'].checkout_date}
-- **Price:** ${result['accommodation_details'].price_per_night}/night
-
-📋 **Itinerary:**
-{result['itinerary']}
-
-📊 **Agent Activity:**
-- **Completed Tasks:** {', '.join(result['completed_tasks'])}
-- **Total Agent Messages:** {len(result.get('agent_messages', []))}
-"""
+            flight = result['flight_details']
+            accommodation = result['accommodation_details']
+            parts = [_STRUCTURED_RESULT_TEMPLATE.format(
+                destination=destination,
+                start_date=start_date,
+                end_date=end_date,
+                travelers=travelers,
+                thread_id=thread_id,
+                airline=flight.airline,
+                flight_number=flight.flight_number,
+                departure=flight.departure_time,
+                arrival=flight.arrival_time,
+                flight_price=flight.price,
+                hotel_name=accommodation.hotel_name,
+                check_in=accommodation.check_in_date,
+                check_out=accommodation.check_out_date,
+                price_per_night=accommodation.price_per_night,
+                itinerary=result['itinerary'],
+                completed_tasks=', '.join(result['completed_tasks']),
+                message_count=len(result.get('agent_messages', []))
+            )]
             
             if result['errors']:
-                response += f"\n\n⚠️ **Errors encountered:**\n"
-                for agent, error in result['errors'].items():
-                    response += f"- {agent}: {error}\n"
+                parts.append("\n\n⚠️ **Errors encountered:**\n")
+                parts.extend(f"- {agent}: {error}\n" for agent, error in result['errors'].items())
             
-            return response
+            return "".join(parts)
             
         else:
             return f"❌ **Error:** {result.get('error', 'Unknown error occurred')}"
@@ -289,6 +396,18 @@ async def plan_trip_structured(destination: str, start_date: str, end_date: str,
         return f"❌ **System Error:** {str(e)}"
 
 
+EXAMPLE_MESSAGES = [
+    "Plan a trip to Paris for 2 people from June 1 to June 7",
+    "I want to visit Tokyo for 4 travelers from December 15 to December 22",
+    "Book a vacation to Bali for 1 person from March 10 to March 17",
+    "Plan a family trip to London for 3 people from August 5 to August 12"
+]
+
+# Warm the parse cache so example clicks skip the regex scan
+for _example in EXAMPLE_MESSAGES:
+    parse_travel_request(_example)
+
+
 # Create the Gradio interface
 with gr.Blocks(title="LangGraph Travel Agent", theme=gr.themes.Soft()) as demo:
     gr.Markdown("""
@@ -336,12 +455,7 @@ with gr.Blocks(title="LangGraph Travel Agent", theme=gr.themes.Soft()) as demo:
     
     # Examples for quick testing
     gr.Examples(
-        examples=[
-            ["Plan a trip to Paris for 2 people from June 1 to June 7"],
-            ["I want to visit Tokyo for 4 travelers from December 15 to December 22"],
-            ["Book a vacation to Bali for 1 person from March 10 to March 17"],
-            ["Plan a family trip to London for 3 people from August 5 to August 12"]
-        ],
+        examples=[[example] for example in EXAMPLE_MESSAGES],
         inputs=message_input,
         label="Try these examples:"
     )
@@ -350,7 +464,8 @@ with gr.Blocks(title="LangGraph Travel Agent", theme=gr.themes.Soft()) as demo:
     submit_btn.click(
         fn=natural_language_travel_agent,
         inputs=message_input,
-        outputs=output
+        outputs=output,
+        api_name="plan"
     )
     
     message_input.submit(
@@ -377,19 +492,20 @@ with gr.Blocks(title="LangGraph Travel Agent", theme=gr.themes.Soft()) as demo:
     """)
 
 
-def launch_ui(share: bool = False, server_port: int = 7860):
+def launch_ui(share: bool = False, server_port: int = 7860, concurrency_count: int = 8):
     """
     Launch the Gradio interface
     
     Args:
         share: Whether to create a public sharing link
         server_port: Port to run the server on
+        concurrency_count: Requests served at once; handlers mostly await LLM/HTTP calls
     """
+    demo.queue(default_concurrency_limit=concurrency_count, max_size=64, api_open=False)
     demo.launch(
         share=share,
         server_port=server_port,
-        show_error=True,
-        show_tips=True
+        show_error=True
     )
 
 
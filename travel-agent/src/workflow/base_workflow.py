@@ -1,30 +1,64 @@
-import openai
-import os
+import asyncio
+import orjson
 from abc import ABC, abstractmethod
-from typing import Dict, Any, TypeVar, Generic
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, TypeVar, Generic
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
-from src.workflow.constants import AGENTIC_GOAL, DEFAULT_LLM_MODEL
+from src.workflow.constants import AGENTIC_GOAL, MAX_BATCH_CONCURRENCY
+from src.workflow.llm_client import cached_chat_completion
 
 T = TypeVar('T')
 
 
+@dataclass(slots=True)
 class BaseWorkflowState:
     """Base state class for all workflows"""
-    def __init__(self):
-        self.messages: list = []
-        self.function_args: dict = {}
-        self.error: str = None
-        self.llm_response = None
+    messages: list = field(default_factory=list)
+    function_args: dict = field(default_factory=dict)
+    error: str = None
+    llm_response: Any = None
 
 
-class BaseLangGraphWorkflow(ABC, Generic[T]):
+class BatchRunMixin:
+    """Adds run_batch to any workflow exposing an async run()"""
+    max_concurrency: int = MAX_BATCH_CONCURRENCY
+
+    async def run_batch(self, inputs: List[Any], max_concurrency: Optional[int] = None) -> List[Any]:
+        """
+        Run the workflow over many inputs concurrently
+        
+        Args:
+            inputs: One run() argument per item, or a tuple of arguments for multi-argument workflows
+            max_concurrency: Cap on in-flight runs; defaults to the class setting
+            
+        Returns:
+            Results in input order, with exceptions returned in place of failed runs
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def run_one(item):
+            async with semaphore:
+                return await (self.run(*item) if isinstance(item, tuple) else self.run(item))
+        
+        return await asyncio.gather(*(run_one(item) for item in inputs), return_exceptions=True)
+
+
+class BaseLangGraphWorkflow(BatchRunMixin, ABC, Generic[T]):
     """Base class for all LangGraph workflows"""
+    # Set per subclass on first instantiation; instances only differ in constant goal/function data
+    _compiled_workflow: CompiledStateGraph = None
     
     def __init__(self, goal: str, function_definition: Dict[str, Any]):
         self.goal = goal
         self.function_definition = function_definition
-        self.workflow = self._create_workflow()
+        self._system_message = f"{AGENTIC_GOAL}\n\nSpecific goal: {goal}"
+        
+        # Look in the subclass's own __dict__ so sibling workflows never share a graph
+        cls = type(self)
+        if cls.__dict__.get("_compiled_workflow") is None:
+            cls._compiled_workflow = self._create_workflow()
+        self.workflow = cls._compiled_workflow
 
     @abstractmethod
     def _create_workflow(self) -> CompiledStateGraph:
@@ -36,20 +70,10 @@ class BaseLangGraphWorkflow(ABC, Generic[T]):
         """Prepare the request - must be implemented by subclasses"""
         pass
 
-    @abstractmethod
-    async def _create_final_result(self, state: BaseWorkflowState) -> BaseWorkflowState:
-        """Create the final result - must be implemented by subclasses"""
-        pass
-
     async def _call_llm(self, state: BaseWorkflowState) -> BaseWorkflowState:
         """Standard LLM calling logic"""
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=DEFAULT_LLM_MODEL,
-                messages=state.messages,
-                functions=[self.function_definition],
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
+            response = await cached_chat_completion(state.messages, self.function_definition)
             state.llm_response = response
         except Exception as e:
             state.error = str(e)
@@ -62,13 +86,12 @@ class BaseLangGraphWorkflow(ABC, Generic[T]):
             
         choice = state.llm_response.choices[0]
         if choice.finish_reason == "function_call":
-            import json
-            state.function_args = json.loads(choice.message.function_call.arguments)
+            state.function_args = orjson.loads(choice.message.function_call.arguments)
         return state
 
     def _prepare_system_message(self) -> str:
         """Prepare the system message with agentic goal"""
-        return f"{AGENTIC_GOAL}\n\nSpecific goal: {self.goal}"
+        return self._system_message
 
     @abstractmethod
     async def run(self, *args, **kwargs) -> T:
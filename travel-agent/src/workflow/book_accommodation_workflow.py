@@ -1,101 +1,127 @@
-import openai
+import asyncio
 import os
-import json
-import requests
+import httpx
+from dataclasses import dataclass, field
 from typing import Dict, Any
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
 from src.models.travel_models import TravelRequest, AccommodationDetails
-from src.workflow.constants import AGENTIC_GOAL, DEFAULT_LLM_MODEL, DEFAULT_HOTEL_NAME, DEFAULT_HOTEL_PRICE_PER_NIGHT, DEFAULT_HOTEL_TOTAL_PRICE
+from src.workflow.base_workflow import BaseLangGraphWorkflow
+from src.workflow.constants import DEFAULT_HOTEL_NAME, DEFAULT_HOTEL_PRICE_PER_NIGHT, DEFAULT_HOTEL_TOTAL_PRICE, MAX_RETRIES, USE_LLM_PARSING
+from src.workflow.http_client import get_http_client
 
 
 ECHO_SERVER_URL = os.getenv("ECHO_SERVER_URL", "http://localhost:8000/hotel-booking")
 
 
+def _is_transient(error: BaseException) -> bool:
+    """True for connection/timeout failures and 429 or 5xx responses"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+@retry(
+    stop=stop_after_attempt(MAX_RETRIES),
+    wait=wait_exponential_jitter(initial=0.2, max=2.0),
+    retry=retry_if_exception(_is_transient),
+    reraise=True
+)
+async def _post_booking(payload: dict) -> dict:
+    """Send a booking to the external service, retrying transient HTTP failures"""
+    response = await get_http_client().post(ECHO_SERVER_URL, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+@dataclass(slots=True)
 class AccommodationBookingState:
     """State for the accommodation booking workflow"""
-    def __init__(self):
-        self.request: TravelRequest = None
-        self.messages: list = []
-        self.function_args: dict = {}
-        self.accommodation_details: AccommodationDetails = None
-        self.booking_payload: dict = {}
-        self.booking_response: dict = {}
-        self.error: str = None
+    request: TravelRequest = None
+    messages: list = field(default_factory=list)
+    function_args: dict = field(default_factory=dict)
+    accommodation_details: AccommodationDetails = None
+    booking_payload: dict = field(default_factory=dict)
+    booking_response: dict = field(default_factory=dict)
+    error: str = None
+    llm_response: Any = None
 
 
-class BookAccommodationAgentWorkflow:
+class BookAccommodationAgentWorkflow(BaseLangGraphWorkflow[AccommodationDetails]):
     def __init__(self):
-        self.goal = "Book the best accommodation for a user based on their travel requirements."
-        self.function_definition = {
-            "name": "book_accommodation",
-            "description": "Book accommodation for a user.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "destination": {"type": "string"},
-                    "start_date": {"type": "string"},
-                    "end_date": {"type": "string"},
-                    "number_of_travelers": {"type": "integer"}
-                },
-                "required": ["destination", "start_date", "end_date", "number_of_travelers"]
+        super().__init__(
+            goal="Book the best accommodation for a user based on their travel requirements.",
+            function_definition={
+                "name": "book_accommodation",
+                "description": "Book accommodation for a user.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "destination": {"type": "string"},
+                        "start_date": {"type": "string"},
+                        "end_date": {"type": "string"},
+                        "number_of_travelers": {"type": "integer"}
+                    },
+                    "required": ["destination", "start_date", "end_date", "number_of_travelers"]
+                }
             }
-        }
-        self.workflow = self._create_workflow()
+        )
 
     def _create_workflow(self) -> CompiledStateGraph:
         """Create the LangGraph workflow for accommodation booking"""
         graph = StateGraph(AccommodationBookingState)
         
-        # Add nodes
-        graph.add_node("prepare_request", self._prepare_request)
-        graph.add_node("call_llm", self._call_llm)
-        graph.add_node("process_response", self._process_response)
-        graph.add_node("prepare_booking", self._prepare_booking)
-        graph.add_node("make_booking", self._make_booking)
         graph.add_node("create_accommodation_details", self._create_accommodation_details)
-        
-        # Add edges
-        graph.set_entry_point("prepare_request")
-        graph.add_edge("prepare_request", "call_llm")
-        graph.add_edge("call_llm", "process_response")
-        graph.add_edge("process_response", "prepare_booking")
-        graph.add_edge("prepare_booking", "make_booking")
-        graph.add_edge("make_booking", "create_accommodation_details")
         graph.add_edge("create_accommodation_details", END)
         
+        if USE_LLM_PARSING:
+            graph.add_node("prepare_request", self._prepare_request)
+            graph.add_node("call_llm_and_book", self._call_llm_and_book)
+            graph.set_entry_point("prepare_request")
+            graph.add_edge("prepare_request", "call_llm_and_book")
+            graph.add_edge("call_llm_and_book", "create_accommodation_details")
+        else:
+            # The LLM would only restate the request, so book straight from it
+            graph.add_node("book_from_request", self._book_from_request)
+            graph.set_entry_point("book_from_request")
+            graph.add_edge("book_from_request", "create_accommodation_details")
+        
         return graph.compile()
 
     async def _prepare_request(self, state: AccommodationBookingState) -> AccommodationBookingState:
         """Prepare the request for LLM processing"""
         state.messages = [
-            {"role": "system", "content": f"{AGENTIC_GOAL}\n\nSpecific goal: {self.goal}"},
+            {"role": "system", "content": self._system_message},
             {"role": "user", "content": f"Book accommodation for {state.request.number_of_travelers} traveler(s) in {state.request.destination} from {state.request.start_date} to {state.request.end_date}."}
         ]
         return state
 
-    async def _call_llm(self, state: AccommodationBookingState) -> AccommodationBookingState:
-        """Call the LLM with the prepared messages"""
-        try:
-            response = await openai.ChatCompletion.acreate(
-                model=DEFAULT_LLM_MODEL,
-                messages=state.messages,
-                functions=[self.function_definition],
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
-            state.llm_response = response
-        except Exception as e:
-            state.error = str(e)
+    async def _book_from_request(self, state: AccommodationBookingState) -> AccommodationBookingState:
+        """Book using the request fields as the function arguments, skipping the LLM"""
+        state.function_args = {
+            "destination": state.request.destination,
+            "start_date": state.request.start_date,
+            "end_date": state.request.end_date,
+            "number_of_travelers": state.request.number_of_travelers
+        }
+        await self._prepare_booking(state)
+        await self._make_booking(state)
         return state
 
-    async def _process_response(self, state: AccommodationBookingState) -> AccommodationBookingState:
-        """Process the LLM response and extract function arguments"""
-        if state.error:
-            return state
-            
-        choice = state.llm_response.choices[0]
-        if choice.finish_reason == "function_call":
-            state.function_args = json.loads(choice.message.function_call.arguments)
+    async def _call_llm_and_book(self, state: AccommodationBookingState) -> AccommodationBookingState:
+        """Call the LLM while optimistically booking from the request data"""
+        # The LLM only restates the request, so book from the request without waiting for it
+        await self._prepare_booking(state)
+        await asyncio.gather(self._call_llm(state), self._make_booking(state))
+        await self._process_response(state)
+        
+        # Re-book only if the LLM's arguments disagree with the request
+        optimistic_payload = state.booking_payload
+        await self._prepare_booking(state)
+        if not state.error and state.booking_payload != optimistic_payload:
+            await self._make_booking(state)
         return state
 
     async def _prepare_booking(self, state: AccommodationBookingState) -> AccommodationBookingState:
@@ -119,8 +145,7 @@ class BookAccommodationAgentWorkflow:
     async def _make_booking(self, state: AccommodationBookingState) -> AccommodationBookingState:
         """Make the booking request to external service"""
         try:
-            response = requests.post(ECHO_SERVER_URL, json=state.booking_payload)
-            state.booking_response = response.json()
+            state.booking_response = await _post_booking(state.booking_payload)
         except Exception as e:
             state.error = str(e)
             state.booking_response = {}
@@ -152,8 +177,8 @@ class BookAccommodationAgentWorkflow:
 
     async def run(self, request: TravelRequest) -> AccommodationDetails:
         """Run the accommodation booking workflow"""
-        state = AccommodationBookingState()
-        state.request = request
+        state = AccommodationBookingState(request=request)
         
+        # ainvoke returns the final channel values as a dict, not a AccommodationBookingState
         final_state = await self.workflow.ainvoke(state)
-        return final_state.accommodation_details
+        return final_state["accommodation_details"]
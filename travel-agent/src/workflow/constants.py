@@ -1,3 +1,5 @@
+import os
+
 # LLM Agentic Goal shared across all workflows
 AGENTIC_GOAL = (
     "You are a travel planning assistant. Your goal is to help users plan their trips by searching for flights, booking accommodations, and creating personalized itineraries. "
@@ -9,6 +11,47 @@ AGENTIC_GOAL = (
 DEFAULT_LLM_MODEL = "gpt-4-1106-preview"
 DEFAULT_TEMPERATURE = 0.7
 MAX_RETRIES = 3
+LLM_TIMEOUT_SECONDS = 15
+MAX_BATCH_CONCURRENCY = 8
+FLIGHT_BULK_CHUNK_SIZE = 20
+OPENAI_BATCH_POLL_SECONDS = 30
+OPENAI_BATCH_COMPLETION_WINDOW = "24h"
+LLM_CACHE_TTL_SECONDS = 3600
+LLM_CACHE_MAX_ENTRIES = 1024
+PLAN_CACHE_TTL_SECONDS = 3600
+MESSAGE_RING_CAPACITY = 64
+
+# Agent task completion flags, combined into a bitmask on multi-agent state
+TASK_FLIGHT_SEARCH = 1
+TASK_ACCOMMODATION_SEARCH = 2
+TASK_ITINERARY_CREATION = 4
+TASK_SEARCHES = TASK_FLIGHT_SEARCH | TASK_ACCOMMODATION_SEARCH
+TASK_ALL = TASK_SEARCHES | TASK_ITINERARY_CREATION
+TASK_NAMES = {
+    TASK_FLIGHT_SEARCH: "flight_search",
+    TASK_ACCOMMODATION_SEARCH: "accommodation_search",
+    TASK_ITINERARY_CREATION: "itinerary_creation"
+}
+# Task names for every possible bitmask, so lookups don't loop over the flags
+TASK_NAMES_BY_MASK = {
+    mask: tuple(name for flag, name in TASK_NAMES.items() if mask & flag)
+    for mask in range(TASK_ALL + 1)
+}
+
+# Print per-agent progress traces; off by default to keep agent hops cheap
+AGENT_TRACE = os.getenv("AGENT_TRACE", "false").lower() == "true"
+
+# Ask the LLM to restate request fields as function-call arguments; off by default since they are already known
+USE_LLM_PARSING = os.getenv("USE_LLM_PARSING", "false").lower() == "true"
+
+# Read once at import; None leaves the missing-key error to the first LLM call
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Cap on in-flight OpenAI requests per process, shared by every workflow and batch
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+
+# Approve travel plans without pausing for human feedback (development runs)
+AGENT_AUTO_APPROVE = os.getenv("AGENT_AUTO_APPROVE", "false").lower() == "true"
 
 # Default values for fallback scenarios
 DEFAULT_AIRLINE = "LLM-Air"
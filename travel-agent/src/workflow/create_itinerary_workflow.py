@@ -1,45 +1,48 @@
-import openai
-import os
-import json
+import orjson
+from dataclasses import dataclass, field
 from typing import Dict, Any
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
 from src.models.travel_models import TravelRequest, FlightDetails, AccommodationDetails
-from src.workflow.constants import AGENTIC_GOAL, DEFAULT_LLM_MODEL
+from src.workflow.base_workflow import BaseLangGraphWorkflow
+from src.workflow.constants import USE_LLM_PARSING
+from src.workflow.llm_client import cached_chat_completion
 
 
+@dataclass(slots=True)
 class ItineraryCreationState:
     """State for the itinerary creation workflow"""
-    def __init__(self):
-        self.request: TravelRequest = None
-        self.flight: FlightDetails = None
-        self.accommodation: AccommodationDetails = None
-        self.messages: list = []
-        self.function_args: dict = {}
-        self.itinerary: str = None
-        self.error: str = None
+    request: TravelRequest = None
+    flight: FlightDetails = None
+    accommodation: AccommodationDetails = None
+    messages: list = field(default_factory=list)
+    function_args: dict = field(default_factory=dict)
+    itinerary: str = None
+    error: str = None
+    llm_response: Any = None
 
 
-class CreateItineraryAgentWorkflow:
+class CreateItineraryAgentWorkflow(BaseLangGraphWorkflow[str]):
     def __init__(self):
-        self.goal = "Create a comprehensive and personalized travel itinerary for a user."
-        self.function_definition = {
-            "name": "create_itinerary",
-            "description": "Create a travel itinerary for a user.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "destination": {"type": "string"},
-                    "start_date": {"type": "string"},
-                    "end_date": {"type": "string"},
-                    "number_of_travelers": {"type": "integer"},
-                    "flight": {"type": "string"},
-                    "accommodation": {"type": "string"}
-                },
-                "required": ["destination", "start_date", "end_date", "number_of_travelers", "flight", "accommodation"]
+        super().__init__(
+            goal="Create a comprehensive and personalized travel itinerary for a user.",
+            function_definition={
+                "name": "create_itinerary",
+                "description": "Create a travel itinerary for a user.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "destination": {"type": "string"},
+                        "start_date": {"type": "string"},
+                        "end_date": {"type": "string"},
+                        "number_of_travelers": {"type": "integer"},
+                        "flight": {"type": "string"},
+                        "accommodation": {"type": "string"}
+                    },
+                    "required": ["destination", "start_date", "end_date", "number_of_travelers", "flight", "accommodation"]
+                }
             }
-        }
-        self.workflow = self._create_workflow()
+        )
 
     def _create_workflow(self) -> CompiledStateGraph:
         """Create the LangGraph workflow for itinerary creation"""
@@ -63,7 +66,7 @@ class CreateItineraryAgentWorkflow:
     async def _prepare_request(self, state: ItineraryCreationState) -> ItineraryCreationState:
         """Prepare the request for LLM processing"""
         state.messages = [
-            {"role": "system", "content": f"{AGENTIC_GOAL}\n\nSpecific goal: {self.goal}"},
+            {"role": "system", "content": self._system_message},
             {"role": "user", "content": f"Create a comprehensive travel itinerary for {state.request.number_of_travelers} traveler(s) to {state.request.destination} from {state.request.start_date} to {state.request.end_date}, including flight {state.flight.flight_number} and stay at {state.accommodation.hotel_name}. Please include suggested activities, dining recommendations, and daily schedules."}
         ]
         return state
@@ -71,12 +74,9 @@ class CreateItineraryAgentWorkflow:
     async def _call_llm(self, state: ItineraryCreationState) -> ItineraryCreationState:
         """Call the LLM with the prepared messages"""
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=DEFAULT_LLM_MODEL,
-                messages=state.messages,
-                functions=[self.function_definition],
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
+            # Only the free-form itinerary needs the LLM; the function arguments would restate the request
+            function_definition = self.function_definition if USE_LLM_PARSING else None
+            response = await cached_chat_completion(state.messages, function_definition)
             state.llm_response = response
         except Exception as e:
             state.error = str(e)
@@ -89,7 +89,7 @@ class CreateItineraryAgentWorkflow:
             
         choice = state.llm_response.choices[0]
         if choice.finish_reason == "function_call":
-            state.function_args = json.loads(choice.message.function_call.arguments)
+            state.function_args = orjson.loads(choice.message.function_call.arguments)
         
         # Get the itinerary content from the LLM response
         state.itinerary = choice.message.content if choice.message.content else "No itinerary generated"
@@ -122,10 +122,8 @@ Note: This is a basic itinerary. For a more detailed plan, please try again or c
 
     async def run(self, request: TravelRequest, flight: FlightDetails, accommodation: AccommodationDetails) -> str:
         """Run the itinerary creation workflow"""
-        state = ItineraryCreationState()
-        state.request = request
-        state.flight = flight
-        state.accommodation = accommodation
+        state = ItineraryCreationState(request=request, flight=flight, accommodation=accommodation)
         
+        # ainvoke returns the final channel values as a dict, not a ItineraryCreationState
         final_state = await self.workflow.ainvoke(state)
-        return final_state.itinerary
+        return final_state["itinerary"]
@@ -0,0 +1,34 @@
+"""
+Shared HTTP client for all outbound workflow traffic
+
+LLM calls and booking requests go through one pooled HTTP/2 client so
+concurrent requests to the same host multiplex over existing connections
+instead of each opening its own TCP/TLS session. Pooled connections belong
+to the event loop that opened them, so each running loop gets its own client.
+"""
+
+import asyncio
+from weakref import WeakKeyDictionary
+import httpx
+
+_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled client for the running event loop, creating it on first use there"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=30.0
+        )
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's pooled connections; call once on shutdown from that loop"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -0,0 +1,156 @@
+"""
+Shared OpenAI client for all LangGraph workflows
+
+One AsyncOpenAI instance per event loop pools HTTP connections across LLM
+calls instead of setting up new request machinery on every call. Responses are
+cached by prompt so repeated identical requests skip the round-trip.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from src.workflow.constants import DEFAULT_LLM_MODEL, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES, MAX_RETRIES, OPENAI_API_KEY, OPENAI_MAX_CONCURRENCY
+from src.workflow.http_client import get_http_client
+
+if TYPE_CHECKING:
+    # openai is imported on first use, so importing a workflow module doesn't load it
+    from openai import AsyncOpenAI
+
+_response_cache: Dict[str, Tuple[float, Any]] = {}
+# Clients and semaphores bind to the event loop that first uses them, so each running loop gets its own
+_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = WeakKeyDictionary()
+_request_slots: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def get_llm_client() -> "AsyncOpenAI":
+    """Return the AsyncOpenAI client for the running event loop, creating it on first use there"""
+    from openai import AsyncOpenAI
+    
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed():
+        client = _clients[loop] = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=get_http_client()
+        )
+    return client
+
+
+def _get_request_slots() -> asyncio.Semaphore:
+    """Return the running event loop's OPENAI_MAX_CONCURRENCY request semaphore"""
+    loop = asyncio.get_running_loop()
+    slots = _request_slots.get(loop)
+    if slots is None:
+        slots = _request_slots[loop] = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+    return slots
+
+
+def _cache_key(messages: List[Dict[str, Any]], function_definition: Optional[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Hash the model, full prompt and function/tool schemas into a cache key"""
+    payload = json.dumps([DEFAULT_LLM_MODEL, messages, function_definition, tools], sort_keys=True)
+    return hashlib.blake2b(payload.encode()).hexdigest()
+
+
+def _is_transient(error: BaseException) -> bool:
+    """True for connection, rate-limit and server errors from the OpenAI API"""
+    import openai
+    return isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
+
+# Transient connection, rate-limit and server errors are retried with jittered backoff
+_retry_transient = retry(
+    stop=stop_after_attempt(MAX_RETRIES),
+    wait=wait_exponential_jitter(initial=0.2, max=2.0),
+    retry=retry_if_exception(_is_transient),
+    reraise=True
+)
+
+
+@_retry_transient
+async def _create_chat_completion(messages: List[Dict[str, Any]], function_definition: Optional[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Any:
+    """Call the chat completions API, retrying transient connection, rate-limit and server errors"""
+    kwargs = {"functions": [function_definition]} if function_definition else {}
+    if tools:
+        # Let the model emit several tool calls in one response
+        kwargs.update(tools=tools, tool_choice="auto", parallel_tool_calls=True)
+    # Hold a slot only for the attempt itself, so backoff sleeps don't block other callers
+    async with _get_request_slots():
+        return await get_llm_client().chat.completions.create(
+            model=DEFAULT_LLM_MODEL,
+            messages=messages,
+            **kwargs
+        )
+
+
+async def cached_chat_completion(messages: List[Dict[str, Any]], function_definition: Optional[Dict[str, Any]] = None, tools: Optional[List[Dict[str, Any]]] = None) -> Any:
+    """Create a chat completion, reusing a cached response for an identical prompt"""
+    key = _cache_key(messages, function_definition, tools)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    
+    response = await _create_chat_completion(messages, function_definition, tools)
+    _cache_put(key, response)
+    return response
+
+
+@_retry_transient
+async def _stream_tool_arguments(messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> str:
+    """Stream a completion and return the first tool call's arguments once they are complete"""
+    chunks = []
+    async with _get_request_slots():
+        stream = await get_llm_client().chat.completions.create(
+            model=DEFAULT_LLM_MODEL,
+            messages=messages,
+            tools=tools,
+            stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta.tool_calls:
+                call = choice.delta.tool_calls[0]
+                if call.index:
+                    # A second tool call started, so the first one's arguments are complete
+                    break
+                if call.function and call.function.arguments:
+                    chunks.append(call.function.arguments)
+            if choice.finish_reason:
+                break
+        # Stop reading anything the model sends after the arguments
+        await stream.close()
+    return "".join(chunks)
+
+
+async def cached_tool_arguments(messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> str:
+    """Stream the first tool call's arguments, reusing cached arguments for an identical prompt"""
+    key = "stream:" + _cache_key(messages, None, tools)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    
+    arguments = await _stream_tool_arguments(messages, tools)
+    _cache_put(key, arguments)
+    return arguments
+
+
+def _cache_get(key: str) -> Any:
+    """Return a cached value that is still within its TTL, or None"""
+    cached = _response_cache.get(key)
+    if cached and time.monotonic() - cached[0] < LLM_CACHE_TTL_SECONDS:
+        return cached[1]
+    return None
+
+
+def _cache_put(key: str, value: Any) -> None:
+    """Cache a value, evicting the oldest entry when full"""
+    _response_cache.pop(key, None)
+    if len(_response_cache) >= LLM_CACHE_MAX_ENTRIES:
+        # Entries are kept in insertion order, so the first one is the oldest
+        _response_cache.pop(next(iter(_response_cache)))
+    _response_cache[key] = (time.monotonic(), value)
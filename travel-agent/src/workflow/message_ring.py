@@ -0,0 +1,35 @@
+"""
+Fixed-capacity message buffer for multi-agent state
+
+Agents log a message on every hop, so the trace is kept in a preallocated
+ring instead of a list that grows (and gets re-serialized) on each step.
+"""
+
+from typing import Any, Dict, List
+from src.workflow.constants import MESSAGE_RING_CAPACITY
+
+
+class MessageRing:
+    """Ring buffer holding the most recent agent messages"""
+    __slots__ = ("buf", "head", "cap")
+
+    def __init__(self, cap: int = MESSAGE_RING_CAPACITY):
+        self.buf: List[Dict[str, Any]] = [None] * cap
+        self.head = 0
+        self.cap = cap
+
+    def push(self, message: Dict[str, Any]) -> None:
+        """Store a message, overwriting the oldest once the ring is full"""
+        self.buf[self.head % self.cap] = message
+        self.head += 1
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return buffered messages oldest first and empty the ring"""
+        start = max(0, self.head - self.cap)
+        messages = [self.buf[i % self.cap] for i in range(start, self.head)]
+        self.buf = [None] * self.cap
+        self.head = 0
+        return messages
+
+    def __len__(self) -> int:
+        return min(self.head, self.cap)
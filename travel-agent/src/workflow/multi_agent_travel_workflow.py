@@ -2,286 +2,237 @@
 Multi-Agent Travel Planning System using LangGraph and Temporal
 
 This implements a true multi-agent architecture where:
-1. A Supervisor Agent coordinates multiple specialized agents
+1. A router coordinates multiple specialized agents
 2. Agents can communicate with each other
 3. Agents run in parallel when possible
 4. Shared state is managed across agents
 """
 
+import asyncio
 from typing import Dict, List, Any, Literal
 from datetime import timedelta
 from temporalio import workflow
+from temporalio.common import RawValue
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
-from src.models.travel_models import TravelRequest, FlightDetails, AccommodationDetails
-from src.activities.llm_activities import search_flights, book_accommodation, create_itinerary
+from src.models.travel_models import TravelRequest, FlightDetails, AccommodationDetails, ItineraryInput
+from src.workflow.constants import TASK_FLIGHT_SEARCH, TASK_ACCOMMODATION_SEARCH, TASK_ITINERARY_CREATION, TASK_SEARCHES, TASK_NAMES_BY_MASK
+from src.workflow.message_ring import MessageRing
+
+# Pass activity modules (and their openai/httpx imports) through the workflow sandbox
+with workflow.unsafe.imports_passed_through():
+    from src.activities.llm_activities import search_flights, book_accommodation, create_itinerary
+
+
+# Prebuilt agent trace messages; pushes merge in only the dynamic field, static ones are pushed as-is
+_MSG_PARALLEL_SEARCH = {"agent": "supervisor", "action": "parallel_search"}
+_MSG_FLIGHT_DONE = {"agent": "flight_agent", "action": "search_completed"}
+_MSG_ACCOM_DONE = {"agent": "accommodation_agent", "action": "search_completed"}
+_MSG_FLIGHT_START = {"agent": "flight_agent", "action": "starting_search"}
+_MSG_FLIGHT_ERROR = {"agent": "flight_agent", "action": "error"}
+_MSG_ACCOM_START = {"agent": "accommodation_agent", "action": "starting_search"}
+_MSG_ACCOM_ERROR = {"agent": "accommodation_agent", "action": "error"}
+_MSG_ITIN_WAITING = {"agent": "itinerary_agent", "action": "waiting_dependencies", "message": "Waiting for flight and accommodation details"}
+_MSG_ITIN_START = {"agent": "itinerary_agent", "action": "creating_itinerary", "message": "Creating comprehensive travel itinerary"}
+_MSG_ITIN_DONE = {"agent": "itinerary_agent", "action": "itinerary_completed", "result": "Comprehensive itinerary created"}
+_MSG_ITIN_ERROR = {"agent": "itinerary_agent", "action": "error"}
 
 
 class MultiAgentState:
     """Shared state across all agents"""
+    __slots__ = (
+        "request", "request_payload", "flight_details", "accommodation_details", "itinerary", "messages",
+        "next_agent", "completed_mask", "errors", "parallel_tasks"
+    )
+    
     def __init__(self):
         self.request: TravelRequest = None
+        self.request_payload: RawValue = None
         self.flight_details: FlightDetails = None
         self.accommodation_details: AccommodationDetails = None
         self.itinerary: str = None
-        self.messages: List[Dict[str, Any]] = []
+        self.messages: MessageRing = MessageRing()
         self.next_agent: str = ""
-        self.completed_tasks: List[str] = []
+        self.completed_mask: int = 0
         self.errors: Dict[str, str] = {}
         self.parallel_tasks: List[str] = []
+    
+    @property
+    def completed_tasks(self) -> List[str]:
+        """Names of completed tasks, derived from the completion bitmask"""
+        return list(TASK_NAMES_BY_MASK[self.completed_mask])
 
 
 @workflow.defn
 class MultiAgentTravelWorkflow:
     """
     Multi-Agent Travel Planning Workflow
-    Uses a supervisor pattern to coordinate specialized agents
+    Routes between specialized agents based on completed tasks
     """
+    # Compiled once per class; the nodes are static and keep all data in the state
+    _compiled_graph: CompiledStateGraph = None
     
     def __init__(self):
-        self.agent_graph = self._create_agent_graph()
+        if type(self)._compiled_graph is None:
+            type(self)._compiled_graph = self._create_agent_graph()
+        self.agent_graph = type(self)._compiled_graph
     
-    def _create_agent_graph(self) -> CompiledStateGraph:
+    @classmethod
+    def _create_agent_graph(cls) -> CompiledStateGraph:
         """Create the multi-agent coordination graph"""
         graph = StateGraph(MultiAgentState)
         
         # Add agent nodes
-        graph.add_node("supervisor", self._supervisor_agent)
-        graph.add_node("flight_agent", self._flight_agent)
-        graph.add_node("accommodation_agent", self._accommodation_agent) 
-        graph.add_node("itinerary_agent", self._itinerary_agent)
-        graph.add_node("coordinator", self._coordinator_agent)
+        graph.add_node("parallel_search", cls._parallel_search_agent)
+        graph.add_node("flight_agent", cls._flight_agent)
+        graph.add_node("accommodation_agent", cls._accommodation_agent) 
+        graph.add_node("itinerary_agent", cls._itinerary_agent)
         
-        # Define the flow
-        graph.set_entry_point("supervisor")
+        # Nothing is completed at the start, so begin with the parallel search
+        graph.set_entry_point("parallel_search")
         
-        # Supervisor decides which agents to activate
-        graph.add_conditional_edges(
-            "supervisor",
-            self._route_to_agents,
-            {
-                "parallel_search": ["flight_agent", "accommodation_agent"],
-                "flight_only": "flight_agent", 
-                "accommodation_only": "accommodation_agent",
-                "itinerary": "itinerary_agent",
-                "end": END
-            }
-        )
-        
-        # Agents report back to coordinator
-        graph.add_edge("flight_agent", "coordinator")
-        graph.add_edge("accommodation_agent", "coordinator")
-        graph.add_edge("itinerary_agent", "coordinator")
-        
-        # Coordinator decides next step
-        graph.add_conditional_edges(
-            "coordinator",
-            self._coordinate_next_step,
-            {
-                "continue": "supervisor",
-                "create_itinerary": "itinerary_agent",
-                "end": END
-            }
-        )
+        # Every agent routes directly to the next one, without supervisor/coordinator hops
+        routes = {
+            "flight_only": "flight_agent",
+            "accommodation_only": "accommodation_agent",
+            "itinerary": "itinerary_agent",
+            "end": END
+        }
+        for agent in ("parallel_search", "flight_agent", "accommodation_agent", "itinerary_agent"):
+            graph.add_conditional_edges(agent, cls._router, routes)
         
         return graph.compile()
     
-    def _route_to_agents(self, state: MultiAgentState) -> str:
-        """Supervisor decides which agents to activate next"""
-        completed = set(state.completed_tasks)
+    @staticmethod
+    def _router(state: MultiAgentState) -> str:
+        """Decide which agent runs next based on completed tasks"""
+        completed = state.completed_mask
         
-        # If nothing completed, start with parallel search
-        if not completed:
-            state.parallel_tasks = ["flight_search", "accommodation_search"]
-            return "parallel_search"
+        # Itinerary done means the plan is complete
+        if completed & TASK_ITINERARY_CREATION:
+            return "end"
         
         # If both search tasks done, create itinerary
-        if {"flight_search", "accommodation_search"}.issubset(completed):
+        if completed & TASK_SEARCHES == TASK_SEARCHES:
             return "itinerary"
         
-        # If only one search task done, wait for the other
-        if "flight_search" in completed and "accommodation_search" not in completed:
+        # If only one search task done, retry the other
+        if completed & TASK_SEARCHES == TASK_FLIGHT_SEARCH:
             return "accommodation_only"
-        elif "accommodation_search" in completed and "flight_search" not in completed:
+        elif completed & TASK_SEARCHES == TASK_ACCOMMODATION_SEARCH:
             return "flight_only"
         
+        # Both searches failed; errors are recorded in state.errors
         return "end"
     
-    def _coordinate_next_step(self, state: MultiAgentState) -> str:
-        """Coordinator determines the next step based on agent results"""
-        completed = set(state.completed_tasks)
-        
-        # Check if we have both flight and accommodation
-        if {"flight_search", "accommodation_search"}.issubset(completed):
-            if "itinerary_creation" not in completed:
-                return "create_itinerary"
+    @staticmethod
+    async def _parallel_search_agent(state: MultiAgentState) -> MultiAgentState:
+        """Parallel Search: Runs the flight and accommodation activities concurrently"""
+        state.parallel_tasks = ["flight_search", "accommodation_search"]
+        state.messages.push(_MSG_PARALLEL_SEARCH | {"message": f"Searching flights and accommodation in {state.request.destination} concurrently"})
         
-        # If we're missing some tasks, continue with supervisor
-        if len(completed) < 3:  # We expect 3 tasks total
-            return "continue"
-        
-        return "end"
-    
-    async def _supervisor_agent(self, state: MultiAgentState) -> MultiAgentState:
-        """
-        Supervisor Agent: Orchestrates the overall travel planning process
-        Decides which agents to activate and monitors progress
-        """
-        state.messages.append({
-            "agent": "supervisor",
-            "action": "planning_coordination", 
-            "message": f"Coordinating travel planning for {state.request.destination}"
-        })
+        flight_task = workflow.start_activity(
+            search_flights,
+            state.request_payload,
+            schedule_to_close_timeout=timedelta(seconds=30)
+        )
+        accommodation_task = workflow.start_activity(
+            book_accommodation,
+            state.request_payload,
+            schedule_to_close_timeout=timedelta(seconds=30)
+        )
+        flight, accommodation = await asyncio.gather(flight_task, accommodation_task, return_exceptions=True)
         
-        # Analyze what needs to be done
-        remaining_tasks = []
-        if "flight_search" not in state.completed_tasks:
-            remaining_tasks.append("flight_search")
-        if "accommodation_search" not in state.completed_tasks:
-            remaining_tasks.append("accommodation_search")
-        if "itinerary_creation" not in state.completed_tasks and len(state.completed_tasks) >= 2:
-            remaining_tasks.append("itinerary_creation")
+        # Record each branch on its own so one failure doesn't discard the other result
+        if isinstance(flight, BaseException):
+            state.errors["flight_agent"] = str(flight)
+        else:
+            state.flight_details = flight
+            state.completed_mask |= TASK_FLIGHT_SEARCH
+            state.messages.push(_MSG_FLIGHT_DONE | {"result": f"Found flight {flight.flight_number}"})
         
-        state.messages.append({
-            "agent": "supervisor",
-            "action": "task_analysis",
-            "remaining_tasks": remaining_tasks
-        })
+        if isinstance(accommodation, BaseException):
+            state.errors["accommodation_agent"] = str(accommodation)
+        else:
+            state.accommodation_details = accommodation
+            state.completed_mask |= TASK_ACCOMMODATION_SEARCH
+            state.messages.push(_MSG_ACCOM_DONE | {"result": f"Booked {accommodation.hotel_name}"})
         
         return state
     
-    async def _flight_agent(self, state: MultiAgentState) -> MultiAgentState:
+    @staticmethod
+    async def _flight_agent(state: MultiAgentState) -> MultiAgentState:
         """Flight Search Agent: Specialized in finding flights"""
         try:
-            state.messages.append({
-                "agent": "flight_agent", 
-                "action": "starting_search",
-                "message": f"Searching flights to {state.request.destination}"
-            })
+            state.messages.push(_MSG_FLIGHT_START | {"message": f"Searching flights to {state.request.destination}"})
             
-            # Execute flight search via Temporal activity
-            state.flight_details = await workflow.execute_activity(
+            # Schedule flight search via Temporal activity, then await its handle
+            flight_handle = workflow.start_activity(
                 search_flights, 
-                state.request, 
+                state.request_payload,
                 schedule_to_close_timeout=timedelta(seconds=30)
             )
+            state.flight_details = await flight_handle
             
-            state.completed_tasks.append("flight_search")
-            state.messages.append({
-                "agent": "flight_agent",
-                "action": "search_completed", 
-                "result": f"Found flight {state.flight_details.flight_number}"
-            })
+            state.completed_mask |= TASK_FLIGHT_SEARCH
+            state.messages.push(_MSG_FLIGHT_DONE | {"result": f"Found flight {state.flight_details.flight_number}"})
             
         except Exception as e:
             state.errors["flight_agent"] = str(e)
-            state.messages.append({
-                "agent": "flight_agent",
-                "action": "error",
-                "message": str(e)
-            })
+            state.messages.push(_MSG_FLIGHT_ERROR | {"message": str(e)})
         
         return state
     
-    async def _accommodation_agent(self, state: MultiAgentState) -> MultiAgentState:
+    @staticmethod
+    async def _accommodation_agent(state: MultiAgentState) -> MultiAgentState:
         """Accommodation Agent: Specialized in booking accommodations"""
         try:
-            state.messages.append({
-                "agent": "accommodation_agent",
-                "action": "starting_search", 
-                "message": f"Searching accommodation in {state.request.destination}"
-            })
+            state.messages.push(_MSG_ACCOM_START | {"message": f"Searching accommodation in {state.request.destination}"})
             
-            # Execute accommodation booking via Temporal activity
-            state.accommodation_details = await workflow.execute_activity(
+            # Schedule accommodation booking via Temporal activity, then await its handle
+            accommodation_handle = workflow.start_activity(
                 book_accommodation,
-                state.request,
+                state.request_payload,
                 schedule_to_close_timeout=timedelta(seconds=30)
             )
+            state.accommodation_details = await accommodation_handle
             
-            state.completed_tasks.append("accommodation_search")
-            state.messages.append({
-                "agent": "accommodation_agent",
-                "action": "search_completed",
-                "result": f"Booked {state.accommodation_details.hotel_name}"
-            })
+            state.completed_mask |= TASK_ACCOMMODATION_SEARCH
+            state.messages.push(_MSG_ACCOM_DONE | {"result": f"Booked {state.accommodation_details.hotel_name}"})
             
         except Exception as e:
             state.errors["accommodation_agent"] = str(e)
-            state.messages.append({
-                "agent": "accommodation_agent", 
-                "action": "error",
-                "message": str(e)
-            })
+            state.messages.push(_MSG_ACCOM_ERROR | {"message": str(e)})
         
         return state
     
-    async def _itinerary_agent(self, state: MultiAgentState) -> MultiAgentState:
+    @staticmethod
+    async def _itinerary_agent(state: MultiAgentState) -> MultiAgentState:
         """Itinerary Agent: Creates comprehensive travel itineraries"""
         try:
             # Wait for dependencies
             if not state.flight_details or not state.accommodation_details:
-                state.messages.append({
-                    "agent": "itinerary_agent",
-                    "action": "waiting_dependencies",
-                    "message": "Waiting for flight and accommodation details"
-                })
+                state.messages.push(_MSG_ITIN_WAITING)
                 return state
             
-            state.messages.append({
-                "agent": "itinerary_agent",
-                "action": "creating_itinerary",
-                "message": "Creating comprehensive travel itinerary"
-            })
+            state.messages.push(_MSG_ITIN_START)
             
             # Execute itinerary creation via Temporal activity
             state.itinerary = await workflow.execute_activity(
                 create_itinerary,
-                state.request,
-                state.flight_details, 
-                state.accommodation_details,
+                ItineraryInput(state.request, state.flight_details, state.accommodation_details),
                 schedule_to_close_timeout=timedelta(seconds=30)
             )
             
-            state.completed_tasks.append("itinerary_creation")
-            state.messages.append({
-                "agent": "itinerary_agent",
-                "action": "itinerary_completed",
-                "result": "Comprehensive itinerary created"
-            })
+            state.completed_mask |= TASK_ITINERARY_CREATION
+            state.messages.push(_MSG_ITIN_DONE)
             
         except Exception as e:
             state.errors["itinerary_agent"] = str(e)
-            state.messages.append({
-                "agent": "itinerary_agent",
-                "action": "error", 
-                "message": str(e)
-            })
+            state.messages.push(_MSG_ITIN_ERROR | {"message": str(e)})
         
         return state
     
-    async def _coordinator_agent(self, state: MultiAgentState) -> MultiAgentState:
-        """
-        Coordinator Agent: Manages agent communication and synchronization
-        Ensures all agents have the information they need
-        """
-        state.messages.append({
-            "agent": "coordinator",
-            "action": "synchronizing",
-            "completed_tasks": state.completed_tasks,
-            "errors": list(state.errors.keys())
-        })
-        
-        # Share information between agents
-        if state.flight_details and state.accommodation_details:
-            state.messages.append({
-                "agent": "coordinator", 
-                "action": "information_sharing",
-                "message": "Flight and accommodation details available for itinerary creation"
-            })
-        
-        return state
-
     @workflow.run
     async def run(self, request: TravelRequest) -> Dict[str, Any]:
         """
@@ -290,21 +241,24 @@ class MultiAgentTravelWorkflow:
         # Initialize shared state
         state = MultiAgentState()
         state.request = request
+        # Encode the request once; both search activities reuse the same payload
+        state.request_payload = RawValue(workflow.payload_converter().to_payload(request))
         
         # Run the multi-agent workflow
         final_state = await self.agent_graph.ainvoke(state)
+        completed_tasks = final_state.completed_tasks
         
         # Return comprehensive results
         return {
             "flights": final_state.flight_details,
             "accommodation": final_state.accommodation_details, 
             "itinerary": final_state.itinerary,
-            "agent_messages": final_state.messages,
-            "completed_tasks": final_state.completed_tasks,
+            "agent_messages": final_state.messages.drain(),
+            "completed_tasks": completed_tasks,
             "errors": final_state.errors,
             "execution_summary": {
                 "total_agents": 4,
-                "successful_tasks": len(final_state.completed_tasks),
+                "successful_tasks": len(completed_tasks),
                 "failed_tasks": len(final_state.errors),
                 "parallel_execution": len(final_state.parallel_tasks) > 1
             }
@@ -0,0 +1,156 @@
+import asyncio
+import orjson
+from dataclasses import dataclass, field
+from typing import Any, Tuple
+from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
+from src.models.travel_models import TravelRequest, FlightDetails, AccommodationDetails
+from src.workflow.base_workflow import BatchRunMixin
+from src.workflow.constants import AGENTIC_GOAL
+from src.workflow.llm_client import cached_chat_completion
+from src.workflow.search_flights_workflow import SearchFlightsAgentWorkflow, FlightSearchState
+from src.workflow.book_accommodation_workflow import BookAccommodationAgentWorkflow, AccommodationBookingState
+from src.workflow.create_itinerary_workflow import CreateItineraryAgentWorkflow, ItineraryCreationState
+
+
+@dataclass(slots=True)
+class PlanTripState:
+    """State for the combined trip planning workflow"""
+    request: TravelRequest = None
+    messages: list = field(default_factory=list)
+    tool_args: dict = field(default_factory=dict)
+    flight_details: FlightDetails = None
+    accommodation_details: AccommodationDetails = None
+    itinerary: str = None
+    error: str = None
+    llm_response: Any = None
+
+
+class PlanTripAgentWorkflow(BatchRunMixin):
+    """Plan flight, accommodation and itinerary from a single LLM call with parallel tool calls"""
+    # Compiled once per class; instances only differ in constant goal/function data
+    _compiled_workflow: CompiledStateGraph = None
+
+    def __init__(self):
+        self.goal = "Search flights, book accommodation and create a personalized itinerary for a user in one step."
+        self._system_message = f"{AGENTIC_GOAL}\n\nSpecific goal: {self.goal}"
+        
+        # Reuse the single-purpose workflows for their schemas and result handling
+        self.flight_workflow = SearchFlightsAgentWorkflow()
+        self.accommodation_workflow = BookAccommodationAgentWorkflow()
+        self.itinerary_workflow = CreateItineraryAgentWorkflow()
+        
+        # The itinerary text has to travel in the tool call since there is no separate content reply
+        itinerary_definition = dict(self.itinerary_workflow.function_definition)
+        itinerary_definition["parameters"] = {
+            **itinerary_definition["parameters"],
+            "properties": {
+                **itinerary_definition["parameters"]["properties"],
+                "itinerary": {"type": "string", "description": "Day-by-day itinerary with activities and dining"}
+            }
+        }
+        self.tools = [
+            {"type": "function", "function": definition}
+            for definition in (
+                self.flight_workflow.function_definition,
+                self.accommodation_workflow.function_definition,
+                itinerary_definition
+            )
+        ]
+        
+        if type(self)._compiled_workflow is None:
+            type(self)._compiled_workflow = self._create_workflow()
+        self.workflow = type(self)._compiled_workflow
+
+    def _create_workflow(self) -> CompiledStateGraph:
+        """Create the LangGraph workflow for combined trip planning"""
+        graph = StateGraph(PlanTripState)
+        
+        # Add nodes
+        graph.add_node("prepare_request", self._prepare_request)
+        graph.add_node("call_llm", self._call_llm)
+        graph.add_node("process_response", self._process_response)
+        graph.add_node("dispatch_tools", self._dispatch_tools)
+        
+        # Add edges
+        graph.set_entry_point("prepare_request")
+        graph.add_edge("prepare_request", "call_llm")
+        graph.add_edge("call_llm", "process_response")
+        graph.add_edge("process_response", "dispatch_tools")
+        graph.add_edge("dispatch_tools", END)
+        
+        return graph.compile()
+
+    async def _prepare_request(self, state: PlanTripState) -> PlanTripState:
+        """Prepare the request for LLM processing"""
+        state.messages = [
+            {"role": "system", "content": self._system_message},
+            {"role": "user", "content": f"Plan a trip for {state.request.number_of_travelers} traveler(s) to {state.request.destination} from {state.request.start_date} to {state.request.end_date}. Call search_flights, book_accommodation and create_itinerary together."}
+        ]
+        return state
+
+    async def _call_llm(self, state: PlanTripState) -> PlanTripState:
+        """Call the LLM once with all three tool schemas"""
+        try:
+            response = await cached_chat_completion(state.messages, tools=self.tools)
+            state.llm_response = response
+        except Exception as e:
+            state.error = str(e)
+        return state
+
+    async def _process_response(self, state: PlanTripState) -> PlanTripState:
+        """Collect the arguments of each emitted tool call by function name"""
+        if state.error:
+            return state
+        
+        tool_calls = state.llm_response.choices[0].message.tool_calls or []
+        for tool_call in tool_calls:
+            state.tool_args[tool_call.function.name] = orjson.loads(tool_call.function.arguments)
+        return state
+
+    async def _dispatch_tools(self, state: PlanTripState) -> PlanTripState:
+        """Run each tool's handler, with flight and booking handled concurrently"""
+        flight_state = FlightSearchState(
+            request=state.request,
+            function_args=state.tool_args.get("search_flights", {}),
+            error=state.error
+        )
+        
+        # Missing tool calls fall back to the request data inside each handler
+        booking_state = AccommodationBookingState(
+            request=state.request,
+            function_args=state.tool_args.get("book_accommodation", {})
+        )
+        
+        flight_update, _ = await asyncio.gather(
+            self.flight_workflow._create_flight_details(flight_state),
+            self._book_accommodation(booking_state)
+        )
+        state.flight_details = flight_update["flight_details"]
+        state.accommodation_details = booking_state.accommodation_details
+        
+        itinerary_state = ItineraryCreationState(
+            request=state.request,
+            flight=state.flight_details,
+            accommodation=state.accommodation_details,
+            itinerary=state.tool_args.get("create_itinerary", {}).get("itinerary"),
+            error=state.error
+        )
+        await self.itinerary_workflow._finalize_itinerary(itinerary_state)
+        state.itinerary = itinerary_state.itinerary
+        return state
+
+    async def _book_accommodation(self, state: AccommodationBookingState) -> AccommodationBookingState:
+        """Book accommodation from the tool call arguments"""
+        await self.accommodation_workflow._prepare_booking(state)
+        await self.accommodation_workflow._make_booking(state)
+        await self.accommodation_workflow._create_accommodation_details(state)
+        return state
+
+    async def run(self, request: TravelRequest) -> Tuple[FlightDetails, AccommodationDetails, str]:
+        """Run the combined trip planning workflow"""
+        state = PlanTripState(request=request)
+        
+        # ainvoke returns the final channel values as a dict, not a PlanTripState
+        final_state = await self.workflow.ainvoke(state)
+        return final_state["flight_details"], final_state["accommodation_details"], final_state["itinerary"]
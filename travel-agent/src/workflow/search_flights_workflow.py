@@ -1,116 +1,253 @@
-import openai
-import os
-import json
-from typing import Dict, Any
+import asyncio
+import orjson
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
 from src.models.travel_models import TravelRequest, FlightDetails
-from src.workflow.constants import AGENTIC_GOAL, DEFAULT_LLM_MODEL, DEFAULT_AIRLINE, DEFAULT_FLIGHT_NUMBER, DEFAULT_FLIGHT_PRICE
+from src.workflow.base_workflow import BaseLangGraphWorkflow
+from src.workflow.constants import DEFAULT_LLM_MODEL, DEFAULT_AIRLINE, DEFAULT_FLIGHT_NUMBER, DEFAULT_FLIGHT_PRICE, LLM_TIMEOUT_SECONDS, OPENAI_BATCH_POLL_SECONDS, OPENAI_BATCH_COMPLETION_WINDOW, FLIGHT_BULK_CHUNK_SIZE
+from src.workflow.llm_client import cached_chat_completion, cached_tool_arguments, get_llm_client
 
 
+@dataclass(slots=True)
 class FlightSearchState:
     """State for the flight search workflow"""
-    def __init__(self):
-        self.request: TravelRequest = None
-        self.messages: list = []
-        self.function_args: dict = {}
-        self.flight_details: FlightDetails = None
-        self.error: str = None
+    request: TravelRequest = None
+    messages: list = field(default_factory=list)
+    function_args: dict = field(default_factory=dict)
+    flight_details: FlightDetails = None
+    error: str = None
+    llm_response: Any = None
+
 
+def apply_update(state: FlightSearchState, update: Dict[str, Any]) -> FlightSearchState:
+    """Apply a node's partial update to a state used outside the graph"""
+    for name, value in update.items():
+        setattr(state, name, value)
+    return state
 
-class SearchFlightsAgentWorkflow:
+
+class SearchFlightsAgentWorkflow(BaseLangGraphWorkflow[FlightDetails]):
     def __init__(self):
-        self.goal = "Find the best flights for a user based on their travel requirements."
-        self.function_definition = {
-            "name": "search_flights",
-            "description": "Search for flights for a user.",
+        super().__init__(
+            goal="Find the best flights for a user based on their travel requirements.",
+            function_definition={
+                "name": "search_flights",
+                "description": "Search for flights for a user.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "destination": {"type": "string"},
+                        "start_date": {"type": "string"},
+                        "end_date": {"type": "string"},
+                        "number_of_travelers": {"type": "integer"}
+                    },
+                    "required": ["destination", "start_date", "end_date", "number_of_travelers"]
+                }
+            }
+        )
+        self.tools = [{"type": "function", "function": self.function_definition}]
+        # One call answers a numbered list of searches, returned in the same order
+        self.bulk_tools = [{"type": "function", "function": {
+            "name": "search_flights_bulk",
+            "description": "Search for flights for several users at once, one query per numbered request.",
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "destination": {"type": "string"},
-                    "start_date": {"type": "string"},
-                    "end_date": {"type": "string"},
-                    "number_of_travelers": {"type": "integer"}
+                    "queries": {"type": "array", "items": self.function_definition["parameters"]}
                 },
-                "required": ["destination", "start_date", "end_date", "number_of_travelers"]
+                "required": ["queries"]
             }
-        }
-        self.workflow = self._create_workflow()
+        }}]
+        # Every request shares the same system message dict
+        self._system_entry = {"role": "system", "content": self._system_message}
 
     def _create_workflow(self) -> CompiledStateGraph:
         """Create the LangGraph workflow for flight search"""
         graph = StateGraph(FlightSearchState)
         
         # Add nodes
-        graph.add_node("prepare_request", self._prepare_request)
-        graph.add_node("call_llm", self._call_llm)
-        graph.add_node("process_response", self._process_response)
+        graph.add_node("llm_step", self._llm_step)
         graph.add_node("create_flight_details", self._create_flight_details)
         
         # Add edges
-        graph.set_entry_point("prepare_request")
-        graph.add_edge("prepare_request", "call_llm")
-        graph.add_edge("call_llm", "process_response")
-        graph.add_edge("process_response", "create_flight_details")
+        graph.set_entry_point("llm_step")
+        graph.add_edge("llm_step", "create_flight_details")
         graph.add_edge("create_flight_details", END)
         
         return graph.compile()
 
-    async def _prepare_request(self, state: FlightSearchState) -> FlightSearchState:
+    # Nodes return only the fields they change, so LangGraph writes just those channels
+    async def _prepare_request(self, state: FlightSearchState) -> Dict[str, Any]:
         """Prepare the request for LLM processing"""
-        state.messages = [
-            {"role": "system", "content": f"{AGENTIC_GOAL}\n\nSpecific goal: {self.goal}"},
-            {"role": "user", "content": f"Find the best flights for {state.request.number_of_travelers} traveler(s) to {state.request.destination} from {state.request.start_date} to {state.request.end_date}."}
-        ]
-        return state
+        return {
+            "messages": [
+                self._system_entry,
+                {"role": "user", "content": f"Find the best flights for {state.request.number_of_travelers} traveler(s) to {state.request.destination} from {state.request.start_date} to {state.request.end_date}."}
+            ],
+            # The fallback only needs the request, so it is ready before the LLM call starts
+            "flight_details": FlightDetails(DEFAULT_AIRLINE, DEFAULT_FLIGHT_NUMBER, state.request.start_date, state.request.end_date, DEFAULT_FLIGHT_PRICE)
+        }
 
-    async def _call_llm(self, state: FlightSearchState) -> FlightSearchState:
-        """Call the LLM with the prepared messages"""
+    async def _llm_step(self, state: FlightSearchState) -> Dict[str, Any]:
+        """Prepare the messages and call the LLM in one node, since the steps never branch"""
+        update = await self._prepare_request(state)
+        state.messages = update["messages"]
+        update.update(await self._call_llm(state))
+        return update
+
+    async def _call_llm(self, state: FlightSearchState) -> Dict[str, Any]:
+        """Call the LLM with the prepared messages, giving up after LLM_TIMEOUT_SECONDS"""
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=DEFAULT_LLM_MODEL,
-                messages=state.messages,
-                functions=[self.function_definition],
-                api_key=os.getenv("OPENAI_API_KEY")
+            # Streaming lets the call return as soon as the tool arguments are complete
+            arguments = await asyncio.wait_for(
+                cached_tool_arguments(state.messages, self.tools),
+                timeout=LLM_TIMEOUT_SECONDS
             )
-            state.llm_response = response
+            return {"function_args": orjson.loads(arguments)} if arguments else {}
+        except asyncio.TimeoutError:
+            # Keep the default flight details built from the request
+            return {"error": "timeout"}
         except Exception as e:
-            state.error = str(e)
-        return state
+            return {"error": str(e)}
 
-    async def _process_response(self, state: FlightSearchState) -> FlightSearchState:
-        """Process the LLM response and extract function arguments"""
-        if state.error:
-            return state
+    async def _process_response(self, state: FlightSearchState) -> Dict[str, Any]:
+        """Extract function arguments from a full (non-streamed) LLM response"""
+        if state.error or state.llm_response is None:
+            return {}
             
-        choice = state.llm_response.choices[0]
-        if choice.finish_reason == "function_call":
-            state.function_args = json.loads(choice.message.function_call.arguments)
-        return state
-
-    async def _create_flight_details(self, state: FlightSearchState) -> FlightSearchState:
-        """Create flight details from the processed response"""
-        if state.error:
-            # Return default flight details if there's an error
-            state.flight_details = FlightDetails(DEFAULT_AIRLINE, DEFAULT_FLIGHT_NUMBER, state.request.start_date, state.request.end_date, DEFAULT_FLIGHT_PRICE)
-        elif state.function_args:
+        message = state.llm_response.choices[0].message
+        if message.tool_calls:
+            return {"function_args": orjson.loads(message.tool_calls[0].function.arguments)}
+        return {}
+
+    async def _create_flight_details(self, state: FlightSearchState) -> Dict[str, Any]:
+        """Create flight details from the processed response, keeping the default on error"""
+        if not state.error and state.function_args:
             # Use function arguments if available
-            state.flight_details = FlightDetails(
+            return {"flight_details": FlightDetails(
                 DEFAULT_AIRLINE, 
                 DEFAULT_FLIGHT_NUMBER, 
                 state.function_args.get("start_date", state.request.start_date),
                 state.function_args.get("end_date", state.request.end_date), 
                 DEFAULT_FLIGHT_PRICE
-            )
-        else:
-            # Fallback to request data
-            state.flight_details = FlightDetails(DEFAULT_AIRLINE, DEFAULT_FLIGHT_NUMBER, state.request.start_date, state.request.end_date, DEFAULT_FLIGHT_PRICE)
-        return state
+            )}
+        if state.flight_details is None:
+            # Fallback to request data when _prepare_request was skipped
+            return {"flight_details": FlightDetails(DEFAULT_AIRLINE, DEFAULT_FLIGHT_NUMBER, state.request.start_date, state.request.end_date, DEFAULT_FLIGHT_PRICE)}
+        return {}
 
     async def run(self, request: TravelRequest) -> FlightDetails:
         """Run the flight search workflow"""
-        state = FlightSearchState()
-        state.request = request
+        state = FlightSearchState(request=request)
         
+        # ainvoke returns the final channel values as a dict, not a FlightSearchState
         final_state = await self.workflow.ainvoke(state)
-        return final_state.flight_details
+        return final_state["flight_details"]
+
+    async def arun_many(self, requests: List[TravelRequest], chunk_size: int = FLIGHT_BULK_CHUNK_SIZE) -> List[FlightDetails]:
+        """
+        Search flights for many requests, packing up to chunk_size of them into each LLM call
+        
+        Args:
+            requests: Travel requests to search flights for
+            chunk_size: Most requests listed in one prompt, to stay within the model context
+            
+        Returns:
+            Flight details in request order, falling back to defaults for unanswered items
+        """
+        chunks = [requests[i:i + chunk_size] for i in range(0, len(requests), chunk_size)]
+        results = await asyncio.gather(*(self._search_chunk(chunk) for chunk in chunks))
+        return [details for chunk_results in results for details in chunk_results]
+
+    async def _search_chunk(self, requests: List[TravelRequest]) -> List[FlightDetails]:
+        """Run one bulk LLM call for a chunk of requests"""
+        numbered = "\n".join(
+            f"{i}. {r.number_of_travelers} traveler(s) to {r.destination} from {r.start_date} to {r.end_date}"
+            for i, r in enumerate(requests, 1)
+        )
+        messages = [
+            self._system_entry,
+            {"role": "user", "content": f"Find the best flights for each of these requests and call search_flights_bulk with one query per request, in order:\n{numbered}"}
+        ]
+        
+        queries = []
+        error = None
+        try:
+            response = await asyncio.wait_for(
+                cached_chat_completion(messages, tools=self.bulk_tools),
+                timeout=LLM_TIMEOUT_SECONDS
+            )
+            tool_calls = response.choices[0].message.tool_calls
+            if tool_calls:
+                queries = orjson.loads(tool_calls[0].function.arguments).get("queries", [])
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception as e:
+            error = str(e)
+        
+        details = []
+        for i, request in enumerate(requests):
+            state = FlightSearchState(request=request, error=error)
+            if i < len(queries) and isinstance(queries[i], dict):
+                state.function_args = queries[i]
+            details.append((await self._create_flight_details(state))["flight_details"])
+        return details
+
+    async def run_batch_via_openai_batch(self, requests: List[TravelRequest]) -> List[FlightDetails]:
+        """
+        Search flights for many requests through the OpenAI Batch API
+        
+        Batch jobs cost half as much as live calls but may take up to the completion
+        window to finish, so this is meant for offline or bulk runs only.
+        
+        Args:
+            requests: Travel requests to search flights for
+            
+        Returns:
+            Flight details in request order, falling back to defaults for failed items
+        """
+        # Only this bulk path needs the response model; keep openai's types off the import path
+        from openai.types.chat import ChatCompletion
+        
+        states = []
+        lines = []
+        for i, request in enumerate(requests):
+            state = FlightSearchState(request=request)
+            apply_update(state, await self._prepare_request(state))
+            states.append(state)
+            lines.append(orjson.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": DEFAULT_LLM_MODEL, "messages": state.messages, "tools": self.tools}
+            }))
+        
+        client = get_llm_client()
+        batch_file = await client.files.create(file=("search_flights.jsonl", b"\n".join(lines)), purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=OPENAI_BATCH_COMPLETION_WINDOW
+        )
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(OPENAI_BATCH_POLL_SECONDS)
+            batch = await client.batches.retrieve(batch.id)
+        
+        for state in states:
+            state.error = f"batch {batch.status}"
+        if batch.output_file_id:
+            output = await client.files.content(batch.output_file_id)
+            for line in output.text.splitlines():
+                result = orjson.loads(line)
+                state = states[int(result["custom_id"])]
+                if result.get("response") and result["response"]["status_code"] == 200:
+                    state.error = None
+                    state.llm_response = ChatCompletion.model_validate(result["response"]["body"])
+        
+        # Items without a successful response keep the defaults from _prepare_request
+        for state in states:
+            apply_update(state, await self._process_response(state))
+            apply_update(state, await self._create_flight_details(state))
+        return [state.flight_details for state in states]
@@ -1,30 +1,36 @@
 """
 Simple Sequential Travel Workflow
 
-This is a basic pipeline approach where agents run sequentially.
+This is a basic pipeline approach: the independent searches run concurrently,
+then the itinerary is created from their results.
 For a true multi-agent system, see multi_agent_travel_workflow.py
 """
 
+import asyncio
 from datetime import timedelta
 from temporalio import workflow
-from src.models.travel_models import TravelRequest, FlightDetails, AccommodationDetails
-from src.activities.llm_activities import search_flights, book_accommodation, create_itinerary
+
+# Pass these through the workflow sandbox instead of re-importing them for every run
+with workflow.unsafe.imports_passed_through():
+    from src.models.travel_models import TravelRequest, FlightDetails, AccommodationDetails, ItineraryInput
+    from src.activities.llm_activities import search_flights, book_accommodation, create_itinerary
 
 @workflow.defn
 class TravelAgentWorkflow:
     """
     Sequential Travel Workflow - Pipeline Pattern
     
-    Flow: Flight Search → Accommodation Booking → Itinerary Creation
-    Each step waits for the previous to complete.
+    Flow: (Flight Search ∥ Accommodation Booking) → Itinerary Creation
+    The searches don't depend on each other; the itinerary waits for both.
     """
     
     @workflow.run
     async def run(self, request: TravelRequest) -> dict:
-        # Sequential execution - each step waits for the previous
-        flight = await workflow.execute_activity(search_flights, request, schedule_to_close_timeout=timedelta(seconds=30))
-        accommodation = await workflow.execute_activity(book_accommodation, request, schedule_to_close_timeout=timedelta(seconds=30))
-        itinerary = await workflow.execute_activity(create_itinerary, request, flight, accommodation, schedule_to_close_timeout=timedelta(seconds=30))
+        # Start both searches before awaiting either
+        flight_task = workflow.start_activity(search_flights, request, schedule_to_close_timeout=timedelta(seconds=30))
+        accommodation_task = workflow.start_activity(book_accommodation, request, schedule_to_close_timeout=timedelta(seconds=30))
+        flight, accommodation = await asyncio.gather(flight_task, accommodation_task)
+        itinerary = await workflow.execute_activity(create_itinerary, ItineraryInput(request, flight, accommodation), schedule_to_close_timeout=timedelta(seconds=30))
         
         return {
             "flights": flight,
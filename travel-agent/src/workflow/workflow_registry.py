@@ -2,9 +2,11 @@
 Workflow Registry - Central registry for all LangGraph workflows
 """
 
+import threading
 from src.workflow.search_flights_workflow import SearchFlightsAgentWorkflow
 from src.workflow.book_accommodation_workflow import BookAccommodationAgentWorkflow
 from src.workflow.create_itinerary_workflow import CreateItineraryAgentWorkflow
+from src.workflow.plan_trip_workflow import PlanTripAgentWorkflow
 
 
 class WorkflowRegistry:
@@ -14,14 +16,32 @@ class WorkflowRegistry:
         "search_flights": SearchFlightsAgentWorkflow,
         "book_accommodation": BookAccommodationAgentWorkflow,
         "create_itinerary": CreateItineraryAgentWorkflow,
+        "plan_trip": PlanTripAgentWorkflow,
     }
+    # Workflows keep no state between run() calls, so one instance per name is reused
+    _instances = {}
+    _lock = threading.Lock()
     
     @classmethod
     def get_workflow(cls, workflow_name: str):
-        """Get a workflow instance by name"""
-        if workflow_name not in cls._workflows:
-            raise ValueError(f"Unknown workflow: {workflow_name}")
-        return cls._workflows[workflow_name]()
+        """Get the shared workflow instance by name"""
+        instance = cls._instances.get(workflow_name)
+        if instance is not None:
+            return instance
+        
+        # Only the first lookup per name takes the lock, so concurrent callers build one instance
+        with cls._lock:
+            if workflow_name not in cls._workflows:
+                raise ValueError(f"Unknown workflow: {workflow_name}")
+            instance = cls._instances.get(workflow_name)
+            if instance is None:
+                instance = cls._instances[workflow_name] = cls._workflows[workflow_name]()
+        return instance
+    
+    @classmethod
+    async def run_batch(cls, workflow_name: str, inputs: list, max_concurrency: int = None) -> list:
+        """Run a workflow over many inputs with bounded concurrency"""
+        return await cls.get_workflow(workflow_name).run_batch(inputs, max_concurrency)
     
     @classmethod
     def list_workflows(cls):
@@ -31,4 +51,6 @@ class WorkflowRegistry:
     @classmethod
     def register_workflow(cls, name: str, workflow_class):
         """Register a new workflow"""
-        cls._workflows[name] = workflow_class
+        with cls._lock:
+            cls._workflows[name] = workflow_class
+            cls._instances.pop(name, None)
@@ -3,14 +3,20 @@ Simple test to verify the LangGraph travel agent works correctly
 """
 
 import asyncio
+import json
+import logging
 import sys
 import os
 
 # Add src to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from models.travel_models import TravelRequest
 from agents.travel_agent import LangGraphTravelAgent
+from buffered_output import run_buffered, task_local_stdout
+
+# Tracebacks of failed tests are logged at DEBUG, so they cost nothing unless debug logging is on
+logger = logging.getLogger("agent_tests")
 
 
 async def test_basic_functionality():
@@ -49,8 +55,7 @@ async def test_basic_functionality():
             
     except Exception as e:
         print(f"❌ Test failed with exception: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Basic functionality test failed", exc_info=True)
         return False
 
 
@@ -70,21 +75,22 @@ async def test_individual_agents():
             number_of_travelers=1
         )
         
-        # Test flight agent
-        print("✈️ Testing flight agent...")
         flight_agent = LangGraphFlightSearchAgent()
-        flight_result = await flight_agent.run(request)
-        print(f"   Flight: {flight_result.airline} {flight_result.flight_number}")
+        accommodation_agent = LangGraphAccommodationAgent()
+        itinerary_agent = LangGraphItineraryAgent()
         
-        # Test accommodation agent
+        # Flight and accommodation are independent, so test them together
+        print("✈️ Testing flight agent...")
         print("🏨 Testing accommodation agent...")
-        accommodation_agent = LangGraphAccommodationAgent()
-        accommodation_result = await accommodation_agent.run(request)
+        flight_result, accommodation_result = await asyncio.gather(
+            flight_agent.run(request),
+            accommodation_agent.run(request)
+        )
+        print(f"   Flight: {flight_result.airline} {flight_result.flight_number}")
         print(f"   Hotel: {accommodation_result.hotel_name}")
         
-        # Test itinerary agent
+        # Test itinerary agent, which needs both results
         print("📋 Testing itinerary agent...")
-        itinerary_agent = LangGraphItineraryAgent()
         itinerary_result = await itinerary_agent.run(request, flight_result, accommodation_result)
         print(f"   Itinerary length: {len(itinerary_result)} characters")
         
@@ -96,22 +102,83 @@ async def test_individual_agents():
         return False
 
 
+async def test_plan_trip_workflow():
+    """Test the combined trip planning workflow with the LLM and booking service mocked"""
+    print("\n🧪 Testing Plan Trip Workflow (mocked LLM)...")
+    
+    from types import SimpleNamespace
+    from src.workflow import book_accommodation_workflow, plan_trip_workflow
+    from src.workflow.plan_trip_workflow import PlanTripAgentWorkflow
+    
+    request = TravelRequest(
+        destination="Lisbon, Portugal",
+        start_date="2025-05-01",
+        end_date="2025-05-05",
+        number_of_travelers=2
+    )
+    trip_args = {"destination": request.destination, "start_date": request.start_date, "end_date": request.end_date, "number_of_travelers": 2}
+    tool_calls = [
+        SimpleNamespace(function=SimpleNamespace(name=name, arguments=json.dumps(args)))
+        for name, args in (
+            ("search_flights", trip_args),
+            ("book_accommodation", trip_args),
+            ("create_itinerary", {**trip_args, "itinerary": "Day 1: Alfama walk"})
+        )
+    ]
+    
+    async def fake_completion(messages, function_definition=None, tools=None):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=tool_calls))])
+    
+    async def fake_booking(payload):
+        return {"hotel_name": "Mock Hotel", "check_in": payload["check_in"], "check_out": payload["check_out"], "price_per_night": 100, "total_price": 400}
+    
+    real_completion, real_booking = plan_trip_workflow.cached_chat_completion, book_accommodation_workflow._post_booking
+    plan_trip_workflow.cached_chat_completion = fake_completion
+    book_accommodation_workflow._post_booking = fake_booking
+    try:
+        flight, accommodation, itinerary = await PlanTripAgentWorkflow().run(request)
+    except Exception as e:
+        print(f"❌ Plan trip workflow failed: {str(e)}")
+        return False
+    finally:
+        plan_trip_workflow.cached_chat_completion = real_completion
+        book_accommodation_workflow._post_booking = real_booking
+    
+    if flight.departure_time == request.start_date and accommodation.hotel_name == "Mock Hotel" and itinerary == "Day 1: Alfama walk":
+        print(f"   Flight: {flight.airline} {flight.flight_number}")
+        print(f"   Hotel: {accommodation.hotel_name}")
+        print("✅ Plan trip workflow working!")
+        return True
+    print(f"❌ Unexpected plan: {flight.departure_time}, {accommodation.hotel_name}, {itinerary!r}")
+    return False
+
+
 async def main():
     """Run all tests"""
     print("🚀 Starting LangGraph Travel Agent Tests\n")
     
-    # Test basic functionality
-    basic_test = await test_basic_functionality()
+    # The tests share no state, so run them concurrently and print their output in order
+    tests = [
+        ("Basic workflow", test_basic_functionality),
+        ("Individual agents", test_individual_agents),
+        ("Plan trip workflow", test_plan_trip_workflow)
+    ]
+    with task_local_stdout():
+        gathered = await asyncio.gather(*(run_buffered(name, func) for name, func in tests))
     
-    # Test individual agents
-    individual_test = await test_individual_agents()
+    results = []
+    for result, output in gathered:
+        print(output, end="")
+        results.append(result)
+    basic_test, individual_test, plan_trip_test = results
     
     # Summary
     print(f"\n📊 Test Results:")
     print(f"   Basic workflow: {'✅ PASS' if basic_test else '❌ FAIL'}")
     print(f"   Individual agents: {'✅ PASS' if individual_test else '❌ FAIL'}")
+    print(f"   Plan trip workflow: {'✅ PASS' if plan_trip_test else '❌ FAIL'}")
     
-    if basic_test and individual_test:
+    if basic_test and individual_test and plan_trip_test:
         print("\n🎉 All tests passed! The LangGraph travel agent is working correctly.")
         return 0
     else:
@@ -5,56 +5,122 @@ Local Testing Guide for LangGraph Travel Agent
 This script demonstrates how to test the travel agent locally with the Gradio UI.
 """
 
+import argparse
+import asyncio
+import importlib.util
 import os
+import selectors
+import shutil
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+# Values that can't change while the script runs, read once at import
+_PY_VERSION = sys.version_info
+_PY_EXE = sys.executable
+_OPENAI_KEY = os.getenv('OPENAI_API_KEY')
 
-def check_requirements():
-    """Check if basic requirements are met"""
-    print("🔍 Checking requirements...")
+# How long yes/no prompts wait before taking their default answer
+_PROMPT_TIMEOUT_SECONDS = 30
+
+
+def _prompt(message, default="", timeout=None):
+    """Read a line from the user, returning default if nothing arrives within timeout seconds"""
+    # Redirected or /dev/null stdin (CI) has nobody to answer and can't be selected on
+    if not sys.stdin.isatty():
+        print(f"{message}{default}")
+        return default
     
-    # Check Python version
-    if sys.version_info < (3, 8):
+    # Windows can't select() on stdin, so prompts there always block
+    if timeout is None or sys.platform == "win32":
+        return input(message)
+    
+    sys.stdout.write(message)
+    sys.stdout.flush()
+    with selectors.DefaultSelector() as selector:
+        selector.register(sys.stdin, selectors.EVENT_READ)
+        if not selector.select(timeout):
+            print(f"\n⏱️  No answer, using default: {default}")
+            return default
+    return sys.stdin.readline().rstrip("\n")
+
+
+def _check_python():
+    """Check the interpreter is new enough"""
+    if _PY_VERSION < (3, 8):
         print("❌ Python 3.8+ required")
         return False
-    print(f"✅ Python {sys.version_info.major}.{sys.version_info.minor}")
-    
-    # Check if we can import required modules
-    try:
-        import pydantic
-        import gradio
-        import langgraph
+    print(f"✅ Python {_PY_VERSION.major}.{_PY_VERSION.minor}")
+    return True
+
+
+def _check_imports():
+    """Return the required packages that can't be found, without paying to import them"""
+    missing = [name for name in ("pydantic", "gradio", "langgraph") if importlib.util.find_spec(name) is None]
+    if not missing:
         print("✅ Required Python packages installed")
-    except ImportError as e:
-        print(f"❌ Missing required package: {e}")
-        print("💡 Run: pip install -r requirements.txt")
-        
-        # Offer to install dependencies
-        try:
-            response = input("🤔 Would you like me to install dependencies? (y/n): ").lower()
-            if response == 'y':
-                install_dependencies()
-                return check_requirements()  # Re-check after installation
-        except KeyboardInterrupt:
-            print("\n🛑 Cancelled")
-        return False
-    
-    # Check OpenAI API key
-    if not os.getenv('OPENAI_API_KEY'):
+    else:
+        print(f"❌ Missing required package: {', '.join(missing)}")
+    return missing
+
+
+def _check_env():
+    """Check the OpenAI API key is configured"""
+    if not _OPENAI_KEY:
         print("⚠️  OPENAI_API_KEY not set - you'll need this for full functionality")
         print("💡 Set it with: export OPENAI_API_KEY='your-key-here'")
     else:
         print("✅ OpenAI API key configured")
+
+
+def _check_docker():
+    """Check docker is on PATH; the daemon is first used by start_postgresql"""
+    if shutil.which("docker"):
+        print("✅ Docker available (for PostgreSQL)")
+        return True
+    print("⚠️  Docker not available (PostgreSQL won't work)")
+    return False
+
+
+def _offer_install(interactive, assume_yes):
+    """Offer to install the requirements, returning True once every package can be found"""
+    print("💡 Run: pip install -r requirements.txt")
     
-    # Check Docker (optional)
     try:
-        subprocess.run(["docker", "--version"], check=True, capture_output=True)
-        print("✅ Docker available (for PostgreSQL)")
-    except:
-        print("⚠️  Docker not available (PostgreSQL won't work)")
+        if assume_yes:
+            response = 'y'
+        elif interactive:
+            response = _prompt("🤔 Would you like me to install dependencies? (y/n): ", default="n", timeout=_PROMPT_TIMEOUT_SECONDS).lower()
+        else:
+            response = 'n'
+        if response == 'y':
+            install_dependencies()
+            # Only the package check can change after installing; find_spec needs fresh finder caches
+            importlib.invalidate_caches()
+            return not _check_imports()
+    except KeyboardInterrupt:
+        print("\n🛑 Cancelled")
+    return False
+
+
+def check_requirements(interactive=True, assume_yes=False):
+    """Check if basic requirements are met
+    
+    Args:
+        interactive: Whether the user can be asked questions
+        assume_yes: Answer yes to any question without asking
+    """
+    print("🔍 Checking requirements...")
+    
+    if not _check_python():
+        return False
+    
+    if _check_imports() and not _offer_install(interactive, assume_yes):
+        return False
     
+    _check_env()
+    _check_docker()
     return True
 
 
@@ -63,18 +129,25 @@ def install_dependencies():
     print("📦 Installing dependencies...")
     
     try:
-        # Try different installation methods
-        install_commands = [
-            [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
-            [sys.executable, "-m", "pip", "install", "--user", "-r", "requirements.txt"],
-            ["pip3", "install", "--user", "-r", "requirements.txt"],
-            ["pip", "install", "-r", "requirements.txt"]
+        # Try different installation methods, skipping ones whose pip isn't there
+        install_commands = []
+        if importlib.util.find_spec("pip") is not None:
+            install_commands += [
+                [_PY_EXE, "-m", "pip", "install", "-r", "requirements.txt"],
+                [_PY_EXE, "-m", "pip", "install", "--user", "-r", "requirements.txt"]
+            ]
+        install_commands += [
+            cmd for cmd in (
+                ["pip3", "install", "--user", "-r", "requirements.txt"],
+                ["pip", "install", "-r", "requirements.txt"]
+            )
+            if shutil.which(cmd[0])
         ]
         
         for cmd in install_commands:
             try:
                 print(f"⏳ Trying: {' '.join(cmd)}")
-                subprocess.run(cmd, check=True, cwd=".")
+                subprocess.run(cmd, check=True)
                 print("✅ Dependencies installed successfully")
                 return True
             except (subprocess.CalledProcessError, FileNotFoundError):
@@ -92,43 +165,62 @@ def install_dependencies():
         return False
 
 
+def _postgres_running():
+    """Whether the langgraph-postgres container exists and is running"""
+    result = subprocess.run(
+        ["docker", "inspect", "-f", "{{.State.Running}}", "langgraph-postgres"],
+        capture_output=True, text=True
+    )
+    return result.returncode == 0 and result.stdout.strip() == "true"
+
+
+def _wait_for_postgres(attempts=50, interval=0.2):
+    """Poll pg_isready in the container until it accepts connections, up to attempts * interval seconds"""
+    for _ in range(attempts):
+        result = subprocess.run(
+            ["docker", "exec", "langgraph-postgres", "pg_isready", "-U", "postgres", "-d", "langgraph_checkpoints"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        if result.returncode == 0:
+            return True
+        time.sleep(interval)
+    return False
+
+
 def start_postgresql():
     """Start PostgreSQL using Docker Compose"""
     print("\n🐘 Starting PostgreSQL for state persistence...")
     
+    if not shutil.which("docker-compose"):
+        print("❌ docker-compose not found. Install Docker Compose first.")
+        return False
+    
     try:
-        # Check if already running
-        result = subprocess.run(
-            ["docker-compose", "-f", "docker-compose.local.yml", "ps", "-q"],
-            capture_output=True, text=True, cwd="."
-        )
-        
-        if result.stdout.strip():
+        # One docker CLI call answers this without starting docker-compose
+        if _postgres_running():
             print("✅ PostgreSQL already running")
             return True
         
-        # Start PostgreSQL
-        subprocess.run(
-            ["docker-compose", "-f", "docker-compose.local.yml", "up", "-d"],
-            check=True, cwd="."
-        )
-        
+        # --wait blocks until the healthcheck passes
         print("⏳ Waiting for PostgreSQL to be ready...")
-        time.sleep(5)
+        try:
+            subprocess.run(
+                ["docker-compose", "-f", "docker-compose.local.yml", "up", "-d", "--wait"],
+                check=True
+            )
+        except subprocess.CalledProcessError:
+            # Older docker-compose has no --wait, so start detached and poll pg_isready instead
+            subprocess.run(
+                ["docker-compose", "-f", "docker-compose.local.yml", "up", "-d"],
+                check=True
+            )
+            if not _wait_for_postgres():
+                print("❌ PostgreSQL failed to start")
+                return False
         
-        # Verify it's running
-        result = subprocess.run(
-            ["docker-compose", "-f", "docker-compose.local.yml", "ps"],
-            capture_output=True, text=True, cwd="."
-        )
+        print("✅ PostgreSQL started successfully")
+        return True
         
-        if "langgraph-postgres" in result.stdout and "Up" in result.stdout:
-            print("✅ PostgreSQL started successfully")
-            return True
-        else:
-            print("❌ PostgreSQL failed to start")
-            return False
-            
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to start PostgreSQL: {e}")
         return False
@@ -142,19 +234,17 @@ def test_basic_functionality():
     print("\n🧪 Running basic functionality test...")
     
     try:
-        result = subprocess.run(
-            [sys.executable, "test_langgraph_agent.py"],
-            capture_output=True, text=True, timeout=60
-        )
+        # Run the tests in this interpreter instead of paying for a second startup and import
+        import test_langgraph_agent
+        exit_code = asyncio.run(asyncio.wait_for(test_langgraph_agent.main(), timeout=60))
         
-        if result.returncode == 0:
+        if exit_code == 0:
             print("✅ Basic functionality test passed")
             return True
         else:
             print("❌ Basic functionality test failed")
-            print(f"Error: {result.stderr}")
             return False
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         print("⏱️ Test timed out - this might be normal for first run")
         return False
     except Exception as e:
@@ -162,81 +252,139 @@ def test_basic_functionality():
         return False
 
 
+_WEB_TIPS = """
+🌐 Starting Gradio web interface...
+📍 The UI will be available at: http://localhost:7860
+
+🎯 Testing Tips:
+  - Use the quick test buttons for easy validation
+  - Try the 'Error Test' to see error handling
+  - Check the 'System Status' tab for configuration info
+  - With PostgreSQL, you can refresh the page to test state persistence
+
+🛑 Press Ctrl+C to stop the server
+
+"""
+
+
 def start_web_ui():
-    """Start the Gradio web interface"""
-    print("\n🌐 Starting Gradio web interface...")
-    print("📍 The UI will be available at: http://localhost:7860")
-    print("\n🎯 Testing Tips:")
-    print("  - Use the quick test buttons for easy validation")
-    print("  - Try the 'Error Test' to see error handling")
-    print("  - Check the 'System Status' tab for configuration info")
-    print("  - With PostgreSQL, you can refresh the page to test state persistence")
-    print("\n🛑 Press Ctrl+C to stop the server\n")
+    """Start the Gradio web interface; this does not return"""
+    sys.stdout.write(_WEB_TIPS)
     
+    # Replace this process with the server instead of keeping a second interpreter around;
+    # anything still buffered would be lost by the exec, so flush first
+    sys.stdout.flush()
+    os.execv(_PY_EXE, [_PY_EXE, "main.py", "--mode", "web"])
+
+
+def _do_postgres():
+    """Menu choice 1: start PostgreSQL and explain which checkpointer will be used"""
+    if start_postgresql():
+        print("💡 PostgreSQL is now running. You can proceed with testing.")
+        print("   The application will automatically use PostgreSQL for state persistence.")
+    else:
+        print("⚠️  PostgreSQL setup failed. The application will use memory checkpointing.")
+
+
+def _do_full():
+    """Menu choice 3: full workflow of PostgreSQL, tests and then the UI"""
+    print("🔄 Full testing workflow...")
+    # The tests use memory checkpointing, so PostgreSQL can boot in the background while they run
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        postgres_started = executor.submit(start_postgresql)
+        test_basic_functionality()
+        postgres_started.result()
+    start_web_ui()
+
+
+def _do_durability():
+    """Menu choice 5: run the durability test suite"""
+    print("🧪 Running comprehensive durability tests...")
     try:
-        subprocess.run([sys.executable, "main.py", "--mode", "web"])
+        import test_agent_durability
+        asyncio.run(test_agent_durability.main())
     except KeyboardInterrupt:
-        print("\n👋 Web server stopped")
+        print("\n🛑 Tests interrupted")
+
+
+def _invalid_choice():
+    """Anything that isn't a menu option"""
+    print("❌ Invalid choice. Please enter 1-6.")
+
+
+_MENU_TEXT = """
+📋 What would you like to do?
+1. 🐘 Start PostgreSQL (recommended)
+2. 🧪 Run basic functionality tests
+3. 🌐 Start Gradio web interface
+4. 🎯 Start web interface (skip tests)
+5. 📊 Run durability tests
+6. ❌ Exit
+"""
+
+# Menu choice -> handler; choice 6 exits the loop in main()
+_MENU_ACTIONS = {
+    "1": _do_postgres,
+    "2": test_basic_functionality,
+    "3": _do_full,
+    "4": start_web_ui,
+    "5": _do_durability
+}
+# Choices that replace this process with the web UI
+_EXEC_ACTIONS = frozenset({"3", "4"})
 
 
 def main():
     """Main testing workflow"""
+    parser = argparse.ArgumentParser(description="Local testing guide for the LangGraph travel agent")
+    parser.add_argument("--non-interactive", action="store_true", help="Never prompt; check requirements and exit")
+    parser.add_argument("--yes", action="store_true", help="Answer yes to every prompt")
+    parser.add_argument("--actions", type=str, help="Comma-separated menu choices to run in order instead of the menu, e.g. 1,2,3; 3 or 4 must come last")
+    args = parser.parse_args()
+    
+    actions = [choice.strip() for choice in args.actions.split(",")] if args.actions else []
+    # Choices 3 and 4 exec the web server and never return, so nothing may follow them
+    for position, choice in enumerate(actions[:-1]):
+        if choice in _EXEC_ACTIONS:
+            parser.error(f"--actions: choice {choice} starts the web UI and must be last, but {','.join(actions[position + 1:])} follows it")
+    
+    # Every relative path below (requirements.txt, docker-compose.local.yml, main.py) is next to this script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
     print("🚀 LangGraph Travel Agent - Local Testing Guide")
     print("=" * 60)
     
     # Check requirements
-    if not check_requirements():
+    if not check_requirements(interactive=not args.non_interactive, assume_yes=args.yes):
         print("❌ Requirements not met. Please fix the issues above.")
         return
     
+    if actions:
+        # Run the requested choices in this one process, stopping at an exit choice
+        for choice in actions:
+            if choice == "6":
+                break
+            _MENU_ACTIONS.get(choice, _invalid_choice)()
+        return
+    
+    if args.non_interactive:
+        print("✅ Requirements met. Skipping the interactive menu.")
+        return
+    
     # Interactive menu
     while True:
-        print("\n📋 What would you like to do?")
-        print("1. 🐘 Start PostgreSQL (recommended)")
-        print("2. 🧪 Run basic functionality tests")
-        print("3. 🌐 Start Gradio web interface")
-        print("4. 🎯 Start web interface (skip tests)")
-        print("5. 📊 Run durability tests")
-        print("6. ❌ Exit")
+        sys.stdout.write(_MENU_TEXT)
         
         try:
             choice = input("\nEnter your choice (1-6): ").strip()
             
-            if choice == "1":
-                if start_postgresql():
-                    print("💡 PostgreSQL is now running. You can proceed with testing.")
-                    print("   The application will automatically use PostgreSQL for state persistence.")
-                else:
-                    print("⚠️  PostgreSQL setup failed. The application will use memory checkpointing.")
-                
-            elif choice == "2":
-                test_basic_functionality()
-                
-            elif choice == "3":
-                # Full workflow: PostgreSQL + Tests + UI
-                print("🔄 Full testing workflow...")
-                start_postgresql()
-                test_basic_functionality()
-                start_web_ui()
-                
-            elif choice == "4":
-                start_web_ui()
-                
-            elif choice == "5":
-                print("🧪 Running comprehensive durability tests...")
-                try:
-                    subprocess.run([sys.executable, "test_agent_durability.py"])
-                except KeyboardInterrupt:
-                    print("\n🛑 Tests interrupted")
-                
-            elif choice == "6":
+            if choice == "6":
                 print("👋 Goodbye!")
                 break
-                
-            else:
-                print("❌ Invalid choice. Please enter 1-6.")
-                
-        except KeyboardInterrupt:
+            
+            _MENU_ACTIONS.get(choice, _invalid_choice)()
+            
+        except (KeyboardInterrupt, EOFError):
             print("\n\n👋 Exiting...")
             break
         except Exception as e: